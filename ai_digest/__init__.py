@@ -0,0 +1,14 @@
+"""AI NEWS digest: collect AI blog feeds and render them into a static page.
+
+    import ai_digest
+    ai_digest.build()          # same as `python -m ai_digest`
+"""
+
+from .archive import Archive
+from .feeds import fetch_feeds
+from .images import enrich_images
+from .items import Item
+from .pipeline import DigestBuilder, build
+from .render import render_digest
+
+__all__ = ['Archive', 'DigestBuilder', 'Item', 'build', 'enrich_images', 'fetch_feeds', 'render_digest']
@@ -0,0 +1,145 @@
+"""Archive of every item the digest has shown, with full-text search.
+
+Items are kept in SQLite by canonical link with the day they were first
+seen, and indexed with FTS5 for search. Each day also gets a static page
+under ARCHIVE_DIR. A build only re-renders today's page, so history is
+written once and never regenerated.
+"""
+
+from pathlib import Path
+import datetime
+import io
+import sqlite3
+
+from . import config
+from .dedupe import canonical_link
+from .items import Item
+from .render import items_payload, render_archive_index, render_digest
+from .storage import write_atomic
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    link_key TEXT UNIQUE NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    link TEXT NOT NULL,
+    image TEXT,
+    first_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_first_seen ON items (first_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, summary, source, content='items', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, title, summary, source) VALUES (new.id, new.title, new.summary, new.source);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, summary, source)
+        VALUES ('delete', old.id, old.title, old.summary, old.source);
+    INSERT INTO items_fts (rowid, title, summary, source) VALUES (new.id, new.title, new.summary, new.source);
+END;
+"""
+
+COLUMNS = 'source, title, summary, link, image, first_seen'
+
+
+class Archive:
+    """Persistent item history in a SQLite database at `path`."""
+
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect(str(path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def record(self, items: list, day: str) -> int:
+        """Add items not seen before as first seen on `day`; returns how many were new.
+
+        Items already archived only pick up an image they were missing.
+        """
+        # rowcount, not total_changes: the FTS trigger's writes count towards the latter
+        added = self.db.executemany(
+            f'INSERT OR IGNORE INTO items (link_key, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(link_key(n), n.source, n.title, n.summary, n.link, n.image, day) for n in items],
+        ).rowcount
+        self.db.executemany(
+            'UPDATE items SET image = ? WHERE link_key = ? AND image IS NULL',
+            [(n.image, link_key(n)) for n in items if n.image],
+        )
+        self.db.commit()
+        return added
+
+    def known_images(self, items: list) -> dict:
+        """{link: image} for items archived with an image, so they need no og:image lookup."""
+        found = {}
+        for n in items:
+            row = self.db.execute('SELECT image FROM items WHERE link_key = ?', (link_key(n),)).fetchone()
+            if row is not None and row['image']:
+                found[n.link] = row['image']
+        return found
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Best matches first, as dicts with the item fields and a highlighted snippet.
+
+        `query` is FTS5 syntax (words, "phrases", OR, prefix*); if it does
+        not parse, its words are searched for literally instead.
+        """
+        columns = ', '.join('items.' + c for c in COLUMNS.split(', '))
+        sql = (f"SELECT {columns}, snippet(items_fts, 1, '[', ']', '…', 12) AS snippet"
+               ' FROM items_fts JOIN items ON items.id = items_fts.rowid'
+               ' WHERE items_fts MATCH ? ORDER BY bm25(items_fts, 5.0, 1.0, 0.5) LIMIT ?')
+        try:
+            rows = self.db.execute(sql, (query, limit)).fetchall()
+        except sqlite3.OperationalError:
+            literal = ' '.join('"%s"' % word.replace('"', '""') for word in query.split())
+            rows = self.db.execute(sql, (literal, limit)).fetchall() if literal else []
+        return [dict(row) for row in rows]
+
+    def days(self) -> list:
+        """Archived days, newest first."""
+        return [row[0] for row in self.db.execute(
+            'SELECT DISTINCT first_seen FROM items ORDER BY first_seen DESC')]
+
+    def items_on(self, day: str) -> list:
+        rows = self.db.execute(f'SELECT {COLUMNS} FROM items WHERE first_seen = ? ORDER BY id', (day,))
+        return [Item(r['source'], r['title'], r['summary'], r['link'], r['image']) for r in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def link_key(n: Item) -> str:
+    return canonical_link(n.link) if n.link else f'{n.source}\n{n.title}'
+
+
+def write_day(archive: Archive, directory: Path, day: str, home: str = None, compress=None) -> bool:
+    """Render the page for `day`, plus the archive index if the day is new to it.
+
+    `compress(path, data)` is called for every file written, and as
+    `compress(path)` for the index when it is kept, so its precompressed
+    siblings follow the output mode. Returns whether the day was new.
+    Other days' pages are not touched.
+    """
+    items = archive.items_on(day)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {directory / f'{day}.json': items_payload(items)}
+
+    out = io.StringIO()
+    shown = datetime.date.fromisoformat(day).strftime(config.DATE_FORMAT)
+    render_digest([n for n in items if n.image], [n for n in items if not n.image], out,
+                  today=shown, items_url=f'{day}.json', archive_url='index.html')
+    page = directory / f'{day}.html'
+    new = not page.exists()
+    files[page] = out.getvalue().encode('utf-8')
+    index = directory / 'index.html'
+    if new or not index.exists():
+        files[index] = render_archive_index(archive.days(), home).encode('utf-8')
+    for path, data in files.items():
+        write_atomic(path, data)
+    if compress is not None:
+        for path, data in files.items():
+            compress(path, data)
+        if index not in files:
+            compress(index)   # reads the kept index back only if it is compressed
+    return new
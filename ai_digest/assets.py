@@ -0,0 +1,93 @@
+"""Static asset output: the page's CSS and JS as content-hashed files.
+
+In this mode the page keeps only the critical CSS inline and links the
+full stylesheet and the script from `ASSETS_DIR`. The file names carry a
+hash of their content, so a static host can cache them for good and a
+new build only changes the small page.
+"""
+
+from pathlib import Path
+import hashlib
+import re
+
+from . import config
+from .storage import write_atomic, write_compressed
+
+STYLE_RE = re.compile(r'<style>\n(.*?)</style>\n', re.S)
+SCRIPT_RE = re.compile(r'<script>\n(.*?)</script>\n', re.S)
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+SELECTOR_KEY_RE = re.compile(r'@[\w-]+|[#.]?[\w-]+|\*|:root')
+
+
+def css_rules(css: str) -> list:
+    """Split a stylesheet into its top-level rules, comments kept with the rule after them."""
+    rules = []
+    depth = start = 0
+    for m in re.finditer(r'/\*.*?\*/|[{}]', css, re.S):
+        if m.group() == '{':
+            depth += 1
+        elif m.group() == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:m.end()].strip('\n'))
+                start = m.end()
+    return rules
+
+
+def is_critical(rule: str, selectors=None) -> bool:
+    """Whether any selector of `rule` starts with one of the critical names.
+
+    '.hero' matches '.hero' and '.hero-title' but not '.heroic'.
+    """
+    selectors = config.CRITICAL_SELECTORS if selectors is None else selectors
+    prelude = COMMENT_RE.sub('', rule).split('{', 1)[0]
+    for selector in prelude.split(','):
+        m = SELECTOR_KEY_RE.match(selector.strip())
+        if m and any(m.group() == s or m.group().startswith(s + '-') for s in selectors):
+            return True
+    return False
+
+
+def critical_css(css: str) -> str:
+    """The critical rules of `css`, plus display:none for config.CRITICAL_HIDDEN."""
+    hidden = ','.join(config.CRITICAL_HIDDEN) + '{display:none}\n' if config.CRITICAL_HIDDEN else ''
+    return hidden + ''.join(rule + '\n' for rule in css_rules(css) if is_critical(rule))
+
+
+def hashed_name(stem: str, suffix: str, data: bytes) -> str:
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{suffix}'
+
+
+def publish(template: str, directory: Path) -> str:
+    """Write the CSS and JS inlined in `template` to hashed files in `directory`.
+
+    Returns the template with the full stylesheet replaced by the
+    critical rules plus a non-blocking link, and the script replaced by a
+    deferred one. Files already on disk are left alone; their names
+    change whenever their content does.
+    """
+    style, script = STYLE_RE.search(template), SCRIPT_RE.search(template)
+    css, js = style.group(1), script.group(1)
+    hrefs = {}
+    for stem, suffix, text in (('site', '.css', css), ('site', '.js', js)):
+        data = text.encode('utf-8')
+        name = hashed_name(stem, suffix, data)
+        path = directory / name
+        if not (path.exists() and path.with_name(name + '.gz').exists()):
+            directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, data)
+            write_compressed(path, data)
+        hrefs[suffix] = f'{directory.name}/{name}'
+
+    css_href, js_href = hrefs['.css'], hrefs['.js']
+    head = (
+        '<style>\n' + critical_css(css) + '</style>\n'
+        + f'<link rel="preload" href="{css_href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        + f'<noscript><link rel="stylesheet" href="{css_href}"></noscript>\n'
+    )
+    return (
+        template[:style.start()] + head
+        + template[style.end():script.start()]
+        + f'<script src="{js_href}" defer></script>\n'
+        + template[script.end():]
+    )
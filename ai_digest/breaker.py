@@ -0,0 +1,85 @@
+"""Per-host circuit breakers, so one dead upstream cannot stall a build.
+
+After config.BREAKER_FAILURES consecutive outages (connection errors,
+timeouts, 5xx) a host is skipped for a cool-down that doubles, up to
+config.BREAKER_MAX_COOLDOWN, each time a trial request after it fails
+again. The state is saved next to the output, so a cron run does not
+rediscover the outage the previous run already paid for.
+"""
+
+from pathlib import Path
+from urllib.parse import urlsplit
+import json
+import threading
+import time
+
+import requests
+
+from . import config
+from .metrics import METRICS
+from .storage import read_json, write_atomic
+
+
+def is_outage(exc: BaseException) -> bool:
+    """Whether an exception says the host is unreachable rather than the request was bad."""
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, TimeoutError))
+
+
+class Breakers:
+    """Thread-safe host -> breaker state."""
+
+    def __init__(self):
+        self.hosts = {}   # host -> {'failures', 'cooldown', 'until', 'probe'}
+        self._lock = threading.Lock()
+
+    def allow(self, url: str) -> bool:
+        """Whether a request to `url`'s host may go out now.
+
+        Once a cool-down has passed, a single trial request is let
+        through; the others keep being skipped until it reports back.
+        """
+        host = urlsplit(url).hostname
+        now = time.time()
+        with self._lock:
+            b = self.hosts.get(host)
+            if b is None or b['failures'] < config.BREAKER_FAILURES:
+                return True
+            if now < b['until'] or now - b.get('probe', 0.0) < config.FEED_DEADLINE:
+                METRICS.incr('breaker_skips', host=host)
+                return False
+            b['probe'] = now
+            return True
+
+    def record(self, url: str, failed: bool):
+        host = urlsplit(url).hostname
+        with self._lock:
+            if not failed:
+                self.hosts.pop(host, None)
+                return
+            b = self.hosts.setdefault(host, {'failures': 0, 'cooldown': 0, 'until': 0.0})
+            b['failures'] += 1
+            b.pop('probe', None)
+            now = time.time()
+            # requests already in flight when the breaker opened do not extend it
+            if b['failures'] >= config.BREAKER_FAILURES and now >= b['until']:
+                b['cooldown'] = min(config.BREAKER_MAX_COOLDOWN, b['cooldown'] * 2 or config.BREAKER_COOLDOWN)
+                b['until'] = now + b['cooldown']
+                METRICS.incr('breaker_trips', host=host)
+
+    def open_hosts(self) -> list:
+        now = time.time()
+        with self._lock:
+            return sorted(h for h, b in self.hosts.items()
+                          if b['failures'] >= config.BREAKER_FAILURES and now < b['until'])
+
+    def load(self, path: Path):
+        with self._lock:
+            self.hosts = {h: {k: v for k, v in b.items() if k != 'probe'} for h, b in read_json(path).items()}
+
+    def save(self, path: Path):
+        with self._lock:
+            data = {h: {k: v for k, v in b.items() if k != 'probe'} for h, b in self.hosts.items()}
+        write_atomic(path, json.dumps(data))
+
+
+BREAKERS = Breakers()
@@ -0,0 +1,135 @@
+"""Command line entry point: `python -m ai_digest` or `ai-digest`."""
+
+from pathlib import Path
+import argparse
+import datetime
+
+from . import config
+from .archive import Archive
+from .daemon import run_daemon, stop_on_signals
+from .pipeline import DigestBuilder
+from .sources import as_sources, dump_registry, import_opml, load_registry, merge
+from .storage import write_atomic
+
+
+def report(result: dict, builder: DigestBuilder):
+    if result['skipped']:
+        print('💤 not due, served from memory: ' + ', '.join(result['skipped']))
+    if result['unchanged']:
+        print('♻️ unchanged since last run: ' + ', '.join(result['unchanged']))
+    if result['stale']:
+        print('🧯 unreachable, last known entries shown: ' + ', '.join(result['stale']))
+    if result['down']:
+        print('⛔ skipping hosts until they recover: ' + ', '.join(result['down']))
+    if any(result['duplicates'].values()):
+        print('🧹 duplicates collapsed: {link} same link, {title} same title, {near} near-identical'
+              .format(**result['duplicates']))
+    print('🖼️ og:image: {hits} hit, {misses} miss, {timeouts} timed out, {cached} from cache'.format(**result['images'])
+          + (', {unreachable} unreachable'.format(**result['images']) if result['images']['unreachable'] else ''))
+    if any(result['probes'][k] for k in ('dead', 'small', 'placeholder')):
+        print('🔎 images dropped: {dead} gone, {small} too small, {placeholder} placeholders'.format(**result['probes']))
+    if result['thumbnails']:
+        print(f"🗜️ thumbnails: {result['thumbnails']} cards use local images")
+    if result['archived']:
+        print(f"🗄️ archived {result['archived']} new items")
+    print('🧩 cards: {rendered} rendered, {reused} reused'.format(**result['cards']))
+    if result['written']:
+        print('🎉 DONE!')
+        print(f'👉 {builder.output.name} updated')
+    else:
+        print(f'👉 {builder.output.name} unchanged, not rewritten')
+    print('⏱️ ' + ', '.join(f'{k} {v:.2f}s' for k, v in result['stages'].items())
+          + f' → {config.RUN_REPORT_FILE}')
+
+
+def import_sources(registry: Path, opml: Path):
+    """Append the OPML feeds missing from `registry`, creating it from the built-in list if needed."""
+    if registry.suffix != '.toml':
+        raise SystemExit(f'{registry}: OPML can only be imported into a .toml registry')
+    existing = load_registry(registry) if registry.exists() else list(as_sources(config.SOURCES).values())
+    added = merge(existing, import_opml(opml))[len(existing):]
+    if registry.exists():
+        with registry.open('a', encoding='utf-8') as f:
+            f.write('\n' + dump_registry(added))
+    else:
+        write_atomic(registry, dump_registry(existing + added))
+    print(f'📥 {len(added)} new source(s) from {opml.name} → {registry}')
+
+
+def search(path: Path, query: str, limit: int):
+    if not path.exists():
+        print(f'🔍 no archive at {path} yet')
+        return
+    archive = Archive(path)
+    try:
+        results = archive.search(query, limit)
+    finally:
+        archive.close()
+    print(f'🔍 {len(results)} result(s) for {query!r}')
+    for r in results:
+        print(f"{r['first_seen']}  {r['source']}: {r['title']}")
+        if r['snippet']:
+            print(f"    {r['snippet']}")
+        print(f"    {r['link']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='ai-digest', description='Build the AI NEWS digest page.')
+    parser.add_argument('--output', type=Path, default=config.OUTPUT,
+                        help='page to write; state and reports go next to it (default index.html)')
+    parser.add_argument('--sources', type=Path,
+                        help=f'source registry (.toml/.yaml) to use (default {config.SOURCES_FILE} next to the output, '
+                             'else the built-in list)')
+    parser.add_argument('--import-opml', type=Path, metavar='OPML',
+                        help='add the feeds of an OPML file to the source registry and exit')
+    parser.add_argument('--no-og-cache', action='store_true',
+                        help='neither read nor update the og:image cache')
+    parser.add_argument('--clear-og-cache', action='store_true',
+                        help='empty the og:image cache before building')
+    parser.add_argument('--full', action='store_true',
+                        help='re-render every card instead of reusing the last build')
+    parser.add_argument('--static-assets', action='store_true',
+                        help=f'move CSS/JS into hashed files under {config.ASSETS_DIR}/, keep critical CSS inline '
+                             'and write .gz/.br siblings of every output file')
+    parser.add_argument('--no-archive', action='store_true',
+                        help=f'do not record items in {config.ARCHIVE_FILE} or write {config.ARCHIVE_DIR}/ pages')
+    parser.add_argument('--search', metavar='QUERY',
+                        help='search the archive (FTS5 syntax: words, "phrases", OR, prefix*) and exit')
+    parser.add_argument('--limit', type=int, default=20, help='results to show with --search (default 20)')
+    parser.add_argument('--due-only', action='store_true',
+                        help='fetch only sources whose adaptive polling interval has passed; '
+                             'the rest are built from their stored entries')
+    parser.add_argument('--daemon', action='store_true',
+                        help='stay resident and rebuild whenever a source is due')
+    parser.add_argument('--interval', type=float,
+                        help=f'refresh interval for sources without publish history yet '
+                             f'(default {config.DAEMON_INTERVAL})')
+    args = parser.parse_args(argv)
+    if args.interval is not None:
+        config.DAEMON_INTERVAL = args.interval
+
+    registry = args.sources or args.output.with_name(config.SOURCES_FILE)
+    if args.import_opml is not None:
+        import_sources(registry, args.import_opml)
+        return
+    if args.search is not None:
+        search(args.output.with_name(config.ARCHIVE_FILE), args.search, args.limit)
+        return
+
+    sources = load_registry(args.sources) if args.sources else None
+    builder = DigestBuilder(args.output, sources, use_og_cache=not args.no_og_cache, static_assets=args.static_assets,
+                            use_archive=not args.no_archive)
+    try:
+        if args.clear_og_cache:
+            builder.clear_og_cache()
+        if args.daemon:
+            def on_build(result):
+                print(f'— {datetime.datetime.now():%Y-%m-%d %H:%M:%S}')
+                report(result, builder)
+
+            run_daemon(builder, stop_on_signals(), on_build)
+        else:
+            refresh = builder.due() if args.due_only else None
+            report(builder.build(full=args.full, refresh=refresh), builder)
+    finally:
+        builder.close()
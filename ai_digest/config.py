@@ -0,0 +1,92 @@
+"""Settings for the digest build.
+
+Modules read these as `config.NAME` at call time, so a long-running
+process or the benchmark can change them without re-importing anything.
+"""
+
+from pathlib import Path
+
+MAX_PER_SOURCE = 8
+CONNECT_TIMEOUT = 4     # seconds to open a connection
+READ_TIMEOUT = 8        # seconds to wait for the next bytes of a response
+HTTP_RETRIES = 2        # retries for connection errors, timeouts, 429 and 5xx, within the caller's deadline
+HTTP_BACKOFF = 0.5      # retry n waits HTTP_BACKOFF * 2 ** (n - 1) seconds
+HTTP_POOL_HOSTS = 32    # hosts whose keep-alive pools are kept
+HTTP_POOL_PER_HOST = 4  # idle connections kept per host
+FEED_WORKERS = 16       # feeds downloaded at the same time
+FEED_PER_HOST = 4       # feeds downloaded at the same time from one host
+FEED_DEADLINE = 20      # seconds a single feed may take end to end, unless its source sets a timeout
+FEED_MAX_BYTES = 8 * 1024 * 1024   # feeds larger than this are abandoned
+FEED_PARSER = 'fast'    # 'fast': stop after the entries we keep, feedparser as fallback; 'feedparser': always
+FEED_CHUNK = 16 * 1024
+BREAKER_FAILURES = 3    # consecutive outages (connection errors, timeouts, 5xx) before a host is skipped
+BREAKER_COOLDOWN = 300  # seconds a tripped host is skipped; doubles while trial requests keep failing
+BREAKER_MAX_COOLDOWN = 6 * 3600
+IMAGE_WORKERS = 8       # og:image lookups in flight overall
+IMAGE_PER_HOST = 2      # og:image lookups in flight against one host
+IMAGE_BUDGET = 30       # seconds for the whole og:image stage
+OG_MAX_BYTES = 256 * 1024  # stop looking for og:image after this much HTML
+OG_CHUNK = 8 * 1024
+OG_CACHE_HIT_TTL = 7 * 24 * 3600   # seconds a found og:image stays valid
+OG_CACHE_MISS_TTL = 12 * 3600      # seconds before a page without one is re-checked
+OG_CACHE_MAX_ENTRIES = 5000        # least recently used links are evicted past this
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'source', 'ocid', 'cmpid', 'sr_share'}
+NEAR_DUP_THRESHOLD = 0.8   # shingle Jaccard similarity above which two items are the same story
+MINHASH_BANDS = 16         # LSH bands x rows = MinHash signature length
+MINHASH_ROWS = 4
+DAEMON_INTERVAL = 900     # seconds between refreshes of a source with no publish history yet
+POLL_MIN = 600            # adaptive polling never fetches a source more often than this
+POLL_MAX = 12 * 3600      # ... nor less often than this
+POLL_FACTOR = 0.25        # poll about four times per typical gap between new entries
+SOURCE_INTERVALS = {}      # source name -> its own refresh interval in seconds (or set `interval` in the registry)
+THUMB_DIR = 'thumbs'      # card thumbnails, next to the output page (needs Pillow)
+THUMB_WIDTHS = (360, 720) # the grid-image column at 1x and 2x
+THUMB_HEIGHT = 210        # height at the smallest width, matching .image-card img
+THUMB_FORMAT = 'webp'     # falls back to 'jpeg' when Pillow lacks WebP support
+THUMB_QUALITY = 80
+THUMB_MAX_BYTES = 8 * 1024 * 1024   # card images larger than this are left hotlinked
+THUMB_BUDGET = 30         # seconds for all thumbnail downloads; images not in by then stay hotlinked
+THUMB_SIZES = '(max-width: 420px) 100vw, 360px'
+PROBE_BYTES = 32 * 1024   # leading bytes fetched to check a card image (enough for its header)
+PROBE_MIN_WIDTH = 200     # card images smaller than this ...
+PROBE_MIN_HEIGHT = 100    # ... or this are dropped, as are ones that are gone
+PROBE_DUPLICATES = 3      # the same picture on this many articles is a placeholder and dropped
+PROBE_BUDGET = 15         # seconds for the image probe stage; images not probed by then are kept
+ASSETS_DIR = 'assets'   # hashed CSS/JS for --static-assets, next to the output page
+# rules kept inline in --static-assets mode: selectors starting with these
+# (exactly or followed by '-') style what is on screen before the stylesheet loads
+CRITICAL_SELECTORS = (':root', '*', 'html', 'body', 'a', '@media', '.container', '.topbar', '.nav',
+                      '.brand', '.menu', '.right-tools', '#google_translate_element', '.hero', '.kicker',
+                      '.btn', '.logo', '.art-shell', '#fireworks', '.section', '.grid', '.image-card',
+                      '.card-pad', '.source')
+# hidden until a script opens them; only their display:none is kept inline
+CRITICAL_HIDDEN = ('#legendPopover', '#quickView', '#toTop')
+PAGE_CARDS = 60           # cards per section in the page; the rest load in shards of this many
+SUMMARY_MAX_CHARS = 400   # Quick View summaries are cut to this, at a word boundary
+CARD_VERSION = 3   # bump whenever the card markup in render.py changes
+DATE_FORMAT = '%d-%m-%Y'
+
+OUTPUT = Path('index.html')
+SOURCES_FILE = 'sources.toml'   # source registry next to the output page; SOURCES is used without one
+ITEMS_FILE = 'items.json'   # card titles, summaries and links for Quick View, next to the page
+SHARD_DIR = 'cards'   # "Load more" card shards, next to the page
+ARCHIVE_DIR = 'archive'   # one static page per day, next to the output page
+# state and report files, kept next to the output page
+FEED_STATE_FILE = 'feed_state.json'
+BREAKER_FILE = 'breakers.json'
+THUMB_INDEX_FILE = 'thumbs.json'
+PROBE_FILE = 'image_probe.json'
+ARCHIVE_FILE = 'archive.sqlite'
+OG_CACHE_FILE = 'og_cache.sqlite'
+MANIFEST_FILE = 'index.manifest.json'
+RUN_REPORT_FILE = 'run_report.json'
+RUN_METRICS_FILE = 'run_report.prom'
+
+SOURCES = {
+    'OpenAI': 'https://openai.com/blog/rss.xml',
+    'Google AI': 'https://blog.google/technology/ai/rss/',
+    'Meta AI': 'https://ai.facebook.com/blog/rss/',
+    'HuggingFace': 'https://huggingface.co/blog/feed.xml',
+    'Towards Data Science': 'https://towardsdatascience.com/feed',
+    'Analytics Vidhya': 'https://www.analyticsvidhya.com/feed/'
+}
@@ -0,0 +1,56 @@
+"""Resident mode: keep one builder warm and refresh sources on their own clocks."""
+
+import datetime
+import signal
+import threading
+import time
+import traceback
+
+from . import config
+from .pipeline import DigestBuilder
+from .schedule import poll_interval
+
+
+def run_daemon(builder: DigestBuilder, stop: threading.Event = None, on_build=None):
+    """Rebuild whenever a source is due, until `stop` is set.
+
+    Each cycle fetches only the sources whose (adaptive) interval has
+    elapsed and builds the rest from memory. A cycle also runs when the date changes,
+    so the page header never shows yesterday. `on_build(result)` is
+    called after every build. A failing cycle is reported and retried at
+    the next due time instead of ending the daemon.
+    """
+    stop = stop or threading.Event()
+    next_due = {}
+    built_on = None
+
+    while not stop.is_set():
+        now = time.monotonic()
+        sources = builder.sources
+        due = [name for name in sources if next_due.get(name, 0.0) <= now]
+        today = datetime.date.today()
+
+        if due or today != built_on:
+            try:
+                result = builder.build(refresh=due)
+                built_on = today
+                if on_build is not None:
+                    on_build(result)
+            except Exception as exc:
+                print(f'⚠️ build failed: {exc!r}')
+                traceback.print_exc()
+            for name in due:
+                next_due[name] = now + poll_interval(sources[name], builder.feed_state.get(sources[name].url))
+
+        wake = min(next_due.get(name, now) for name in sources) if sources else now + config.DAEMON_INTERVAL
+        midnight = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time())
+        until_midnight = (midnight - datetime.datetime.now()).total_seconds()
+        stop.wait(max(1.0, min(wake - time.monotonic(), until_midnight + 1)))
+
+
+def stop_on_signals() -> threading.Event:
+    """An event that SIGINT and SIGTERM set, for a clean shutdown."""
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    return stop
@@ -0,0 +1,124 @@
+"""Cross-source de-duplication of digest items."""
+
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import html as html_lib
+import re
+import unicodedata
+
+from . import config
+
+
+def canonical_link(link: str) -> str:
+    """Normalize a link so syndicated copies of one URL compare equal."""
+    parts = urlsplit((link or '').strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host += f':{parts.port}'
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in config.TRACKING_PARAMS
+    ]
+    return urlunsplit(('https', host, parts.path.rstrip('/') or '/', urlencode(sorted(query)), ''))
+
+
+def plain_words(text: str) -> list:
+    """Lower-cased, accent-free words of RSS text with tags removed."""
+    text = re.sub(r'<[^>]*>', ' ', html_lib.unescape(text or ''))
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def shingles(words: list, k: int = 3) -> set:
+    if not words:
+        return set()
+    if len(words) <= k:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+@lru_cache(maxsize=None)
+def _minhash_seeds(count: int) -> tuple:
+    return tuple(
+        (int.from_bytes(hashlib.blake2b(f'a{i}'.encode(), digest_size=8).digest(), 'big') % _MINHASH_PRIME | 1,
+         int.from_bytes(hashlib.blake2b(f'b{i}'.encode(), digest_size=8).digest(), 'big') % _MINHASH_PRIME)
+        for i in range(count)
+    )
+
+
+def minhash(shingle_set: set) -> list:
+    hashed = [int.from_bytes(hashlib.blake2b(sh.encode(), digest_size=8).digest(), 'big') for sh in shingle_set]
+    seeds = _minhash_seeds(config.MINHASH_BANDS * config.MINHASH_ROWS)
+    return [min((a * h + b) % _MINHASH_PRIME for h in hashed) for a, b in seeds]
+
+
+@lru_cache(maxsize=8192)
+def story_signature(title: str, summary: str) -> tuple:
+    """(shingle set, MinHash signature) of an item's text.
+
+    Cached by content, so a resident process only hashes new items. Text
+    without words has no signature and is never a near duplicate.
+    """
+    sh = frozenset(shingles(plain_words(title) + plain_words(summary)[:60]))
+    return sh, tuple(minhash(sh)) if sh else ()
+
+
+def dedupe_items(items: list) -> tuple:
+    """Collapse items that are the same story, keeping the first one seen.
+
+    Exact duplicates are found through canonical links and title
+    fingerprints; near duplicates through MinHash LSH over word shingles
+    of title and summary, confirmed with the exact Jaccard similarity;
+    signatures are only computed for items the exact checks let through.
+    A kept item without an image borrows the image of its duplicate.
+    """
+    stats = {'link': 0, 'title': 0, 'near': 0}
+    kept = []
+    by_link = {}
+    by_title = {}
+    buckets = defaultdict(list)   # (band, band hash) -> kept indices
+    kept_shingles = []
+
+    for n in items:
+        fingerprint = ' '.join(plain_words(n.title))
+        link_key = canonical_link(n.link) if n.link else None
+
+        match, reason = None, None
+        if link_key in by_link:
+            match, reason = by_link[link_key], 'link'
+        elif fingerprint and fingerprint in by_title:
+            match, reason = by_title[fingerprint], 'title'
+        else:
+            sh, signature = story_signature(n.title, n.summary)
+            bands = [(b, signature[b * config.MINHASH_ROWS:(b + 1) * config.MINHASH_ROWS])
+                     for b in range(config.MINHASH_BANDS)] if signature else []
+            for i in sorted({i for band in bands for i in buckets[band]}):
+                other = kept_shingles[i]
+                if len(sh & other) / len(sh | other) >= config.NEAR_DUP_THRESHOLD:
+                    match, reason = i, 'near'
+                    break
+
+        if match is not None:
+            stats[reason] += 1
+            if not kept[match].image and n.image:
+                kept[match].image = n.image
+            continue
+
+        index = len(kept)
+        kept.append(n)
+        kept_shingles.append(sh)
+        if link_key:
+            by_link[link_key] = index
+        if fingerprint:
+            by_title[fingerprint] = index
+        for band in bands:
+            buckets[band].append(index)
+
+    return kept, stats
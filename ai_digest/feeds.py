@@ -0,0 +1,285 @@
+"""Feed stage: concurrent, conditional downloads parsed into entry records."""
+
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from pathlib import Path
+import calendar
+import hashlib
+import json
+import time
+
+import feedparser
+import requests
+
+from . import config, fastfeed, net
+from .breaker import BREAKERS, is_outage
+from .items import Item
+from .metrics import METRICS
+from .schedule import record_poll
+from .sources import as_sources
+from .storage import read_json, write_atomic
+
+
+def one_line(text: str) -> str:
+    return (text or '').replace('\n', ' ').strip()
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of an HTML fragment, minus script and style contents."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self.skip += 1
+        elif tag in ('br', 'p', 'div', 'li'):
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self.skip:
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(data)
+
+
+def summary_text(markup: str, limit: int = None) -> str:
+    """Plain text of an RSS summary, cut at a word boundary to `limit` characters."""
+    limit = config.SUMMARY_MAX_CHARS if limit is None else limit
+    parser = _TextExtractor()
+    parser.feed(markup or '')
+    parser.close()
+    text = ' '.join(''.join(parser.parts).split())
+    if len(text) > limit:
+        text = text[:limit].rsplit(' ', 1)[0].rstrip(' ,;:.-') + '…'
+    return text
+
+
+def entry_record(e) -> dict:
+    """The entry fields the digest uses, as plain JSON-friendly values."""
+    img = None
+    if 'media_content' in e:
+        try:
+            img = e.media_content[0].get('url')
+        except Exception:
+            METRICS.incr('swallowed_exceptions', site='media_content')
+            img = None
+    stamp = e.get('published_parsed') or e.get('updated_parsed')
+    return {
+        'title': getattr(e, 'title', ''),
+        'summary': e.get('summary', ''),
+        'link': getattr(e, 'link', ''),
+        'image': img,
+        'published': calendar.timegm(stamp) if stamp else None,
+    }
+
+
+def load_feed_state(path: Path) -> dict:
+    return read_json(path)
+
+
+def save_feed_state(path: Path, state: dict):
+    write_atomic(path, json.dumps(state, ensure_ascii=False))
+
+
+def parse_feed(body: bytes, response_headers: dict, limit: int = None) -> list:
+    """Parse raw feed bytes into the first `limit` (default config.MAX_PER_SOURCE) entry records.
+
+    With config.FEED_PARSER = 'fast' the bounded fastfeed parser is tried
+    first; feeds it cannot handle go through feedparser.
+
+    `response_headers` carries content-location and content-type so that
+    relative links and charsets resolve as if feedparser fetched the URL.
+    """
+    limit = config.MAX_PER_SOURCE if limit is None else limit
+    if config.FEED_PARSER == 'fast':
+        try:
+            return fastfeed.parse_entries(body, limit, response_headers.get('content-location', ''))
+        except fastfeed.UnsupportedFeed:
+            METRICS.incr('parser_fallbacks')
+    feed = feedparser.parse(body, response_headers=response_headers)
+    return [entry_record(e) for e in feed.entries[:limit]]
+
+
+def fetch_feed(url: str, known: dict = None, limit: int = None, timeout: float = None) -> dict:
+    """Download one feed within `timeout` (default config.FEED_DEADLINE) seconds and parse it.
+
+    `known` is the stored state from the previous run. Its ETag and
+    Last-Modified make the request conditional, and its entries are
+    reused when the server answers 304 or sends the same bytes again.
+    Feeds larger than config.FEED_MAX_BYTES are abandoned, so hundreds of
+    sources cannot add up to unbounded memory. A host whose circuit breaker
+    is open is not contacted at all.
+    """
+    limit = config.MAX_PER_SOURCE if limit is None else limit
+    if not BREAKERS.allow(url):
+        return {'entries': [], 'ok': False, 'unchanged': False}
+    known = known or {}
+    if known.get('limit', config.MAX_PER_SOURCE) != limit:
+        known = {}   # stored entries were cut to another limit; fetch and parse afresh
+    deadline = time.monotonic() + (config.FEED_DEADLINE if timeout is None else timeout)
+    headers = {'User-Agent': feedparser.USER_AGENT, 'Accept': feedparser.http.ACCEPT_HEADER}
+    if known.get('etag'):
+        headers['If-None-Match'] = known['etag']
+    if known.get('modified'):
+        headers['If-Modified-Since'] = known['modified']
+    try:
+        with net.get(url, deadline, headers=headers, stream=True) as r:
+            BREAKERS.record(url, r.status_code >= 500)
+            if r.status_code == 304 and 'entries' in known:
+                return dict(known, ok=True, unchanged=True)
+            if r.status_code >= 400:
+                raise requests.HTTPError(f'{r.status_code} for {url}')
+            body = bytearray()
+            for chunk in r.iter_content(config.FEED_CHUNK):
+                body += chunk
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f'feed deadline exceeded for {url}')
+                if len(body) > config.FEED_MAX_BYTES:
+                    raise ValueError(f'feed larger than {config.FEED_MAX_BYTES} bytes: {url}')
+            METRICS.incr('bytes_downloaded', len(body), kind='feed')
+            response_headers = {
+                'content-location': r.url,
+                'content-type': r.headers.get('Content-Type', ''),
+            }
+            result = {
+                'etag': r.headers.get('ETag'),
+                'modified': r.headers.get('Last-Modified'),
+                'sha256': hashlib.sha256(body).hexdigest(),
+                'bytes': len(body),
+            }
+        if result['sha256'] == known.get('sha256') and 'entries' in known:
+            return dict(result, entries=known['entries'], limit=limit, ok=True, unchanged=True)
+        entries = parse_feed(bytes(body), response_headers, limit)
+        del body
+        return dict(result, entries=entries, ok=True, unchanged=False)
+    except Exception as exc:
+        if is_outage(exc):
+            BREAKERS.record(url, True)
+        METRICS.incr('swallowed_exceptions', site='feed')
+        return {'entries': [], 'ok': False, 'unchanged': False}
+
+
+def fetch_feeds(sources: dict, state: dict = None, only=None) -> dict:
+    """Fetch all feeds through a bounded pool; result keeps the order of `sources`.
+
+    `sources` maps names to feed URLs or sources.Source objects. `state`
+    maps feed URL to what the previous run stored for it and is updated
+    in place for every feed that was fetched successfully.
+    When `only` is given, sources outside it are not contacted and their
+    stored entries are reused (unless nothing is stored for them yet).
+    At most config.FEED_WORKERS feeds download at once and at most
+    config.FEED_PER_HOST from one host, so a registry of hundreds of
+    feeds takes about as long as its slowest feeds, not their number.
+    A feed that fails, is still running at its deadline, or whose host's
+    circuit breaker is open is served from its stored entries and marked
+    stale instead of dropping out.
+    """
+    sources = as_sources(sources)
+    state = {} if state is None else state
+    feeds = {}
+    started = {}   # source name -> time.monotonic() its fetch began
+    abandoned = set()
+
+    def fallback(source, feed):
+        stored = state.get(source.url, {})
+        if 'entries' in stored:
+            return dict(stored, ok=False, unchanged=False, stale=True)
+        return feed
+
+    def timed_fetch(source):
+        started[source.name] = time.monotonic()
+        t0 = time.perf_counter()
+        feed = fetch_feed(source.url, state.get(source.url, {}), source.max_entries, source.deadline)
+        seconds = round(time.perf_counter() - t0, 4)
+        if not feed['ok']:
+            feed = fallback(source, feed)
+        if source.name in abandoned:
+            return feed
+        METRICS.source(
+            source.name,
+            seconds=seconds,
+            entries=len(feed['entries']),
+            bytes=feed.get('bytes', 0),
+            status=('stale' if feed.get('stale') else 'failed') if not feed['ok']
+            else 'unchanged' if feed['unchanged'] else 'fetched',
+        )
+        feed['seconds'] = seconds
+        return feed
+
+    pending = []
+    for source in sources.values():
+        METRICS.source(source.name)   # keep the report in registry order
+        stored = state.get(source.url, {})
+        if only is not None and source.name not in only and 'entries' in stored:
+            feeds[source.name] = dict(stored, ok=True, unchanged=True, skipped=True)
+            METRICS.source(source.name, seconds=0.0, entries=len(stored['entries']), bytes=0, status='skipped')
+        else:
+            pending.append(source)
+    # feeds that were slow last time start first, so their wait overlaps the rest
+    pending.sort(key=lambda s: state.get(s.url, {}).get('seconds', 0.0), reverse=True)
+    queues = defaultdict(deque)   # host -> sources to fetch
+    for source in pending:
+        queues[urlsplit(source.url).hostname].append(source)
+
+    busy = defaultdict(int)
+    running = {}                  # future -> (host, source)
+    pool = ThreadPoolExecutor(max_workers=config.FEED_WORKERS)
+    try:
+        while queues or running:
+            for host in list(queues):
+                while queues[host] and busy[host] < config.FEED_PER_HOST and len(running) < config.FEED_WORKERS:
+                    source = queues[host].popleft()
+                    running[pool.submit(timed_fetch, source)] = (host, source)
+                    busy[host] += 1
+                if not queues[host]:
+                    del queues[host]
+            # wake up at the first deadline of a fetch in progress, if none finishes before
+            deadlines = [started[s.name] + s.deadline for _, s in running.values() if s.name in started]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else 0.1
+            wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for f in list(running):
+                host, source = running[f]
+                if f.done():
+                    feed = feeds[source.name] = f.result()
+                elif source.name in started and now >= started[source.name] + source.deadline:
+                    # abandoned: its thread ends on its own, bounded by the same deadline
+                    abandoned.add(source.name)
+                    feed = feeds[source.name] = fallback(source, {'entries': [], 'ok': False, 'unchanged': False})
+                    METRICS.source(source.name, seconds=source.deadline, entries=len(feed['entries']), bytes=0,
+                                   status='stale' if feed.get('stale') else 'failed')
+                else:
+                    continue
+                del running[f]
+                busy[host] -= 1
+                if feed['ok']:
+                    stored = {k: feed[k] for k in ('etag', 'modified', 'sha256', 'seconds', 'entries')}
+                    stored['limit'] = source.max_entries
+                    state[source.url] = record_poll(stored, state.get(source.url, {}))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return {name: feeds[name] for name in sources}
+
+
+def feed_items(feeds: dict, sources: dict = None) -> list:
+    """Turn fetched feeds into digest items, in source order.
+
+    A source whose image policy is 'none' contributes items without images.
+    """
+    sources = as_sources(sources or {})
+    items = []
+    for name, feed in feeds.items():
+        source = sources.get(name)
+        limit = source.max_entries if source else config.MAX_PER_SOURCE
+        keep_images = source is None or source.images != 'none'
+        for e in feed['entries'][:limit]:
+            items.append(Item(name, one_line(e['title']), summary_text(e['summary']), e['link'],
+                              e['image'] if keep_images else None))
+    return items
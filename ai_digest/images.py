@@ -0,0 +1,281 @@
+"""og:image lookups: head-only scraping, a persistent cache and a bounded pool."""
+
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+import codecs
+import sqlite3
+import time
+
+from . import config, net
+from .breaker import BREAKERS, is_outage
+from .metrics import METRICS
+
+UNREACHABLE = object()   # get_og_image result when the host failed; not cached, unlike None
+
+
+class HeadMetaScanner(HTMLParser):
+    """Picks og:image / twitter:image out of <meta> tags, stops at </head>."""
+
+    def __init__(self):
+        super().__init__()
+        self.og_image = None
+        self.twitter_image = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.done = True
+        if tag != 'meta':
+            return
+        a = dict(attrs)
+        content = a.get('content')
+        if not content:
+            return
+        if a.get('property') == 'og:image':
+            self.og_image = content
+            self.done = True
+        elif (a.get('name') or a.get('property')) in ('twitter:image', 'twitter:image:src'):
+            self.twitter_image = self.twitter_image or content
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+
+    @property
+    def image(self):
+        return self.og_image or self.twitter_image
+
+
+def _decoder(encoding):
+    try:
+        return codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def get_og_image(url: str, deadline: float = None):
+    """Stream the page head and return its og:image (or twitter:image).
+
+    Reading stops at </head>, once og:image is found, or after
+    config.OG_MAX_BYTES, so a lookup costs a few KB instead of the whole article.
+    Returns UNREACHABLE if the host is down, so the miss is not cached.
+    """
+    t0 = time.perf_counter()
+    seen = 0
+    try:
+        with net.get(url, deadline, stream=True) as r:
+            BREAKERS.record(url, r.status_code >= 500)
+            if r.status_code >= 500:
+                return UNREACHABLE
+            scanner = HeadMetaScanner()
+            decode = _decoder(r.encoding).decode
+            for chunk in r.iter_content(config.OG_CHUNK):
+                seen += len(chunk)
+                scanner.feed(decode(chunk))
+                if scanner.done or seen >= config.OG_MAX_BYTES:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+            return scanner.image
+    except Exception as exc:
+        METRICS.incr('swallowed_exceptions', site='og_image')
+        if is_outage(exc):
+            BREAKERS.record(url, True)
+            return UNREACHABLE
+    finally:
+        METRICS.incr('bytes_downloaded', seen, kind='og_image')
+        METRICS.observe('og_image_lookup', time.perf_counter() - t0)
+    return None
+
+
+class OgImageCache:
+    """Persistent link -> og:image map, including pages that have none."""
+
+    def __init__(self, path, hit_ttl=None, miss_ttl=None, max_entries=None):
+        self.hit_ttl = config.OG_CACHE_HIT_TTL if hit_ttl is None else hit_ttl
+        self.miss_ttl = config.OG_CACHE_MISS_TTL if miss_ttl is None else miss_ttl
+        self.max_entries = config.OG_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS og_image ('
+            ' link TEXT PRIMARY KEY, image TEXT, checked REAL NOT NULL, used REAL NOT NULL)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS og_image_used ON og_image (used)')
+
+    def lookup(self, links) -> dict:
+        """Return {link: image or None} for links with a fresh cache entry."""
+        return {link: image for link, (image, _) in self.entries(links).items()}
+
+    def entries(self, links) -> dict:
+        """Return {link: (image or None, time checked)} for links with a fresh cache entry."""
+        now = time.time()
+        found = {}
+        for link in links:
+            row = self.db.execute('SELECT image, checked FROM og_image WHERE link = ?', (link,)).fetchone()
+            if row is None:
+                continue
+            image, checked = row
+            if now - checked <= (self.hit_ttl if image else self.miss_ttl):
+                found[link] = (image, checked)
+        if found:
+            self.db.executemany('UPDATE og_image SET used = ? WHERE link = ?',
+                                [(now, link) for link in found])
+            self.db.commit()
+        return found
+
+    def store(self, results: dict):
+        """Save {link: image or None} and evict the least recently used overflow."""
+        now = time.time()
+        self.db.executemany(
+            'INSERT OR REPLACE INTO og_image (link, image, checked, used) VALUES (?, ?, ?, ?)',
+            [(link, image, now, now) for link, image in results.items()],
+        )
+        self.db.execute(
+            'DELETE FROM og_image WHERE link NOT IN'
+            ' (SELECT link FROM og_image ORDER BY used DESC LIMIT ?)', (self.max_entries,)
+        )
+        self.db.commit()
+
+    def clear(self):
+        self.db.execute('DELETE FROM og_image')
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class MemoryImageCache:
+    """In-process og:image results in front of an optional OgImageCache.
+
+    Offers the same lookup/store interface, so a resident builder answers
+    repeat links from memory and only touches SQLite for links it has not
+    seen since it started.
+    """
+
+    def __init__(self, backing: OgImageCache = None):
+        self.backing = backing
+        self.entries = OrderedDict()   # link -> (image or None, learned at)
+
+    def lookup(self, links) -> dict:
+        now = time.time()
+        found = {}
+        missing = []
+        for link in links:
+            entry = self.entries.get(link)
+            ttl = config.OG_CACHE_HIT_TTL if entry and entry[0] else config.OG_CACHE_MISS_TTL
+            if entry and now - entry[1] <= ttl:
+                found[link] = entry[0]
+                self.entries.move_to_end(link)
+            else:
+                missing.append(link)
+        if self.backing is not None and missing:
+            # keep when each entry was checked, so it expires when it would on disk
+            for link, (image, checked) in self.backing.entries(missing).items():
+                self._remember({link: image}, checked)
+                found[link] = image
+        return found
+
+    def store(self, results: dict):
+        self._remember(results, time.time())
+        if self.backing is not None:
+            self.backing.store(results)
+
+    def _remember(self, results: dict, now: float):
+        for link, image in results.items():
+            self.entries[link] = (image, now)
+            self.entries.move_to_end(link)
+        while len(self.entries) > config.OG_CACHE_MAX_ENTRIES:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        if self.backing is not None:
+            self.backing.clear()
+
+    def close(self):
+        if self.backing is not None:
+            self.backing.close()
+
+
+def per_host(links, lookup, budget: float) -> dict:
+    """Run lookup(link, deadline) for `links` through a bounded worker pool.
+
+    At most config.IMAGE_WORKERS lookups run at once and at most
+    config.IMAGE_PER_HOST against any single host, in the order given.
+    Links on a host whose circuit breaker is open get UNREACHABLE without a
+    request. Returns {link: result} for the lookups finished within
+    `budget` seconds; the rest are abandoned.
+    """
+    queues = defaultdict(deque)   # host -> links, in page order
+    for link in links:
+        queues[urlsplit(link).hostname].append(link)
+    busy = defaultdict(int)
+    running = {}                  # future -> (host, link)
+    results = {}
+    deadline = time.monotonic() + budget
+
+    pool = ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS)
+    try:
+        while queues or running:
+            for host in list(queues):
+                while queues[host] and busy[host] < config.IMAGE_PER_HOST and len(running) < config.IMAGE_WORKERS:
+                    link = queues[host].popleft()
+                    if not BREAKERS.allow(link):
+                        results[link] = UNREACHABLE
+                        continue
+                    running[pool.submit(lookup, link, deadline)] = (host, link)
+                    busy[host] += 1
+                if not queues[host]:
+                    del queues[host]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            for f in done:
+                host, link = running.pop(f)
+                busy[host] -= 1
+                results[link] = f.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def enrich_images(items: list, cache=None) -> dict:
+    """Fill in missing images from og:image through per_host().
+
+    Links with a fresh entry in `cache` are answered without a request.
+    Lookups not finished within config.IMAGE_BUDGET are abandoned and
+    their items stay without an image. Lookups against a host that
+    failed or whose circuit breaker is open count as unreachable and are
+    retried on a later build.
+    """
+    stats = {'hits': 0, 'misses': 0, 'timeouts': 0, 'cached': 0, 'unreachable': 0}
+    waiting = defaultdict(list)   # link -> items needing it
+    for n in items:
+        if not n.image and n.link:
+            waiting[n.link].append(n)
+    if cache is not None:
+        for link, img in cache.lookup(waiting).items():
+            for n in waiting.pop(link):
+                n.image = img
+            stats['cached'] += 1
+    if not waiting:
+        return stats
+
+    results = per_host(waiting, get_og_image, config.IMAGE_BUDGET)
+    resolved = {}                 # link -> image or None, for the cache
+    for link, img in results.items():
+        if img is UNREACHABLE:
+            stats['unreachable'] += 1
+            continue
+        stats['hits' if img else 'misses'] += 1
+        resolved[link] = img
+        for n in waiting[link]:
+            n.image = img
+    if cache is not None and resolved:
+        cache.store(resolved)
+    stats['timeouts'] = len(waiting) - len(results)
+    return stats
@@ -0,0 +1,25 @@
+"""The digest item record shared by every stage."""
+
+
+class Item:
+    """One story on the page.
+
+    Title and summary are kept as plain (unescaped) text; escaping
+    happens once, when a card is rendered.
+    """
+
+    __slots__ = ('source', 'title', 'summary', 'link', 'image', 'thumb')
+
+    def __init__(self, source: str, title: str, summary: str, link: str, image: str = None, thumb: dict = None):
+        self.source = source
+        self.title = title
+        self.summary = summary
+        self.link = link
+        self.image = image
+        self.thumb = thumb   # local thumbnail <img> attributes, see thumbs.srcset()
+
+    def fields(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __repr__(self):
+        return f'Item({self.source!r}, {self.title!r}, link={self.link!r})'
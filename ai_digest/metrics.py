@@ -0,0 +1,122 @@
+"""Run metrics: stage timers and counters, reported as JSON and Prometheus text."""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+import datetime
+import json
+import threading
+import time
+
+from .storage import write_atomic
+
+
+class RunMetrics:
+    """Timers and counters for one digest run, safe to update from threads.
+
+    Counters and timings may carry one label (e.g. site='og_image'); the
+    report renders as JSON and as Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}                  # stage -> seconds
+        self.sources = {}                 # source -> {seconds, entries, bytes, status}
+        self.counters = defaultdict(int)  # (name, label, value) -> count
+        self.timings = defaultdict(lambda: [0, 0.0])   # (name, label, value) -> [count, seconds]
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def incr(self, name: str, n: int = 1, **label):
+        key = (name,) + next(iter(label.items()), ('', ''))
+        with self._lock:
+            self.counters[key] += n
+
+    def observe(self, name: str, seconds: float, **label):
+        key = (name,) + next(iter(label.items()), ('', ''))
+        with self._lock:
+            self.timings[key][0] += 1
+            self.timings[key][1] += seconds
+
+    def source(self, name: str, **fields):
+        with self._lock:
+            self.sources.setdefault(name, {}).update(fields)
+
+    def report(self) -> dict:
+        counters = {}
+        for (name, label, value), n in sorted(self.counters.items()):
+            if label:
+                counters.setdefault(name, {})[value] = n
+            else:
+                counters[name] = n
+        timings = {}
+        for (name, label, value), (count, seconds) in sorted(self.timings.items()):
+            entry = {'count': count, 'seconds': round(seconds, 4)}
+            if label:
+                timings.setdefault(name, {})[value] = entry
+            else:
+                timings[name] = entry
+        return {
+            'started': datetime.datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'duration_seconds': round(time.time() - self.started, 4),
+            'stages': {k: round(v, 4) for k, v in self.stages.items()},
+            'sources': self.sources,
+            'counters': counters,
+            'timings': timings,
+        }
+
+    def prometheus(self) -> str:
+        def esc(v):
+            return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        def labels(**kw):
+            kw = {k: v for k, v in kw.items() if k}
+            return '{' + ','.join(f'{k}="{esc(v)}"' for k, v in kw.items()) + '}' if kw else ''
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP ai_digest_{name} {help_text}')
+            lines.append(f'# TYPE ai_digest_{name} {kind}')
+            lines.extend(f'ai_digest_{name}{lab} {value}' for lab, value in samples)
+
+        metric('run_timestamp_seconds', 'gauge', 'Unix time the run started.', [('', self.started)])
+        metric('run_duration_seconds', 'gauge', 'Wall time of the whole run.', [('', time.time() - self.started)])
+        metric('stage_seconds', 'gauge', 'Wall time per pipeline stage.',
+               [(labels(stage=k), v) for k, v in self.stages.items()])
+        metric('source_fetch_seconds', 'gauge', 'Wall time to fetch and parse each feed.',
+               [(labels(source=k), v.get('seconds', 0)) for k, v in self.sources.items()])
+        metric('source_entries', 'gauge', 'Entries taken from each feed.',
+               [(labels(source=k), v.get('entries', 0)) for k, v in self.sources.items()])
+        # every value starts from zero each run, so counts are gauges: as counters
+        # Prometheus would read each new run as a reset
+        for name in sorted({key[0] for key in self.counters}):
+            metric(name, 'gauge', f'{name.replace("_", " ").capitalize()} in this run.',
+                   [(labels(**{label: value}), n) for (nm, label, value), n in sorted(self.counters.items()) if nm == name])
+        for name in sorted({key[0] for key in self.timings}):
+            samples = [(labels(**{label: value}), c, sec)
+                       for (nm, label, value), (c, sec) in sorted(self.timings.items()) if nm == name]
+            what = name.replace('_', ' ')
+            metric(f'{name}_seconds', 'gauge', f'Time spent in {what} calls in this run.',
+                   [(lab, sec) for lab, _, sec in samples])
+            metric(f'{name}_calls', 'gauge', f'Number of {what} calls in this run.',
+                   [(lab, c) for lab, c, _ in samples])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path: Path, prom_path: Path):
+        write_atomic(json_path, json.dumps(self.report(), indent=2, ensure_ascii=False))
+        write_atomic(prom_path, self.prometheus())
+
+
+METRICS = RunMetrics()
@@ -0,0 +1,99 @@
+"""One shared HTTP session for every outbound request.
+
+Connections are pooled per host and kept alive between requests and
+between builds of a resident process. get() retries transient failures
+(connection errors, timeouts, 429 and 5xx answers) a bounded number of
+times with exponential backoff, within the caller's deadline.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import config
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session = None
+_lock = threading.Lock()
+
+
+def new_session() -> requests.Session:
+    # no urllib3 retries: they would not know the caller's deadline; get() retries instead
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_HOSTS,
+        pool_maxsize=config.HTTP_POOL_PER_HOST,
+        max_retries=0,
+    )
+    s = requests.Session()
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
+    s.headers['User-Agent'] = 'Mozilla/5.0'
+    return s
+
+
+def session() -> requests.Session:
+    """The process-wide session, created on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+
+def close_session():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def timeout(deadline: float = None) -> tuple:
+    """(connect, read) timeouts, shortened so they end by `deadline`."""
+    connect, read = config.CONNECT_TIMEOUT, config.READ_TIMEOUT
+    if deadline is not None:
+        left = max(0.1, deadline - time.monotonic())
+        connect, read = min(connect, left), min(read, left)
+    return connect, read
+
+
+def _backoff(attempt: int, response, deadline: float = None):
+    """Seconds to wait before retry number `attempt + 1`, or None to stop retrying."""
+    delay = config.HTTP_BACKOFF * 2 ** attempt
+    after = response.headers.get('Retry-After', '') if response is not None else ''
+    if after.isdigit():
+        if int(after) > config.READ_TIMEOUT:
+            return None   # the server wants a break; come back on a later build
+        delay = max(delay, int(after))
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+def get(url: str, deadline: float = None, **kwargs) -> requests.Response:
+    """GET through the shared session, retrying transient failures.
+
+    Connection errors, timeouts, 429 and 5xx answers are retried up to
+    config.HTTP_RETRIES times, waiting HTTP_BACKOFF * 2 ** (n - 1) seconds
+    (or the server's Retry-After) before retry n. Every attempt gets the
+    timeouts left until `deadline` and no retry starts past it, so the
+    call as a whole ends by the deadline rather than a multiple of it.
+    The last 429/5xx response is returned, not raised.
+    """
+    for attempt in range(config.HTTP_RETRIES + 1):
+        last = attempt == config.HTTP_RETRIES
+        try:
+            r = session().get(url, timeout=timeout(deadline), **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            delay = None if last else _backoff(attempt, None, deadline)
+            if delay is None:
+                raise
+        else:
+            delay = None if last or r.status_code not in RETRY_STATUSES else _backoff(attempt, r, deadline)
+            if delay is None:
+                return r
+            r.close()
+        time.sleep(delay)
@@ -0,0 +1,235 @@
+"""The digest build: fetch -> dedupe -> enrich -> probe -> thumbs -> archive -> render -> write."""
+
+from pathlib import Path
+import datetime
+import hashlib
+import json
+import os
+
+from . import config
+from .archive import Archive, write_day
+from .assets import publish
+from .breaker import BREAKERS
+from .dedupe import dedupe_items
+from .feeds import feed_items, fetch_feeds, load_feed_state, save_feed_state
+from .images import MemoryImageCache, OgImageCache, enrich_images
+from .metrics import METRICS
+from .probe import ImageProbes, validate_images
+from .render import HEAD, items_payload, render_digest
+from .schedule import due_sources, poll_interval
+from .sources import as_sources, load_registry
+from .storage import HashingWriter, read_json, remove_compressed, write_atomic, write_compressed
+from .thumbs import ThumbnailStore, make_thumbnails
+
+
+class DigestBuilder:
+    """Builds the digest page, keeping state warm between builds.
+
+    Feed state, og:image results, circuit breakers and the card manifest
+    are loaded once and then kept in memory, so a resident process calling
+    build() repeatedly only pays for them on the first call.
+    """
+
+    def __init__(self, output: Path = None, sources: dict = None, use_og_cache: bool = True,
+                 static_assets: bool = False, use_archive: bool = True):
+        self.output = Path(output or config.OUTPUT)
+        if sources is None:
+            registry = self.path(config.SOURCES_FILE)
+            sources = load_registry(registry) if registry.exists() else config.SOURCES
+        self.sources = as_sources(sources)
+        self.static_assets = static_assets
+        self._head = None
+        backing = OgImageCache(self.path(config.OG_CACHE_FILE)) if use_og_cache else None
+        self.og_cache = MemoryImageCache(backing)
+        self.feed_state = load_feed_state(self.path(config.FEED_STATE_FILE))
+        self.manifest = read_json(self.path(config.MANIFEST_FILE))
+        BREAKERS.load(self.path(config.BREAKER_FILE))
+        self.probes = ImageProbes(self.path(config.PROBE_FILE))
+        self.thumbs = ThumbnailStore(self.path(config.THUMB_DIR), self.path(config.THUMB_INDEX_FILE))
+        self.archive = Archive(self.path(config.ARCHIVE_FILE)) if use_archive else None
+
+    def path(self, name: str) -> Path:
+        """A state or report file next to the output page."""
+        return self.output.with_name(name)
+
+    def build(self, full: bool = False, refresh=None) -> dict:
+        """Run one build and return a summary of what happened.
+
+        `refresh` limits which sources are fetched; the others are built
+        from their stored entries. The page is swapped in atomically and
+        only when its content changed.
+        """
+        METRICS.reset()
+
+        with METRICS.stage('fetch'):
+            feeds = fetch_feeds(self.sources, self.feed_state, only=refresh)
+            save_feed_state(self.path(config.FEED_STATE_FILE), self.feed_state)
+        for name, source in self.sources.items():
+            METRICS.source(name, poll_interval=round(poll_interval(source, self.feed_state.get(source.url))))
+        skipped = [source for source, feed in feeds.items() if feed.get('skipped')]
+        unchanged = [source for source, feed in feeds.items() if feed['unchanged'] and not feed.get('skipped')]
+        stale = [source for source, feed in feeds.items() if feed.get('stale')]
+
+        with METRICS.stage('dedupe'):
+            items = feed_items(feeds, self.sources)
+            METRICS.incr('entries', len(items))
+            items, dup_stats = dedupe_items(items)
+        for reason, n in dup_stats.items():
+            METRICS.incr('duplicates', n, reason=reason)
+
+        with METRICS.stage('enrich'):
+            lookup = [n for n in items if self.sources[n.source].images == 'og']
+            if self.archive is not None:
+                # articles archived with an image need no og:image lookup
+                known = self.archive.known_images([n for n in lookup if not n.image])
+                for n in lookup:
+                    n.image = n.image or known.get(n.link)
+                METRICS.incr('archived_images', len(known))
+            image_stats = enrich_images(lookup, self.og_cache)
+        for outcome, n in image_stats.items():
+            METRICS.incr('image_lookups', n, outcome=outcome)
+
+        with METRICS.stage('probe'):
+            probe_stats = validate_images(items, self.probes)
+        for outcome, n in probe_stats.items():
+            METRICS.incr('image_probes', n, outcome=outcome)
+
+        with_image = [n for n in items if n.image]
+        no_image = [n for n in items if not n.image]
+        METRICS.incr('items', len(with_image), section='featured')
+        METRICS.incr('items', len(no_image), section='more')
+
+        with METRICS.stage('thumbs'):
+            thumbnails = make_thumbnails(with_image, self.thumbs)
+
+        archived = 0
+        if self.archive is not None:
+            with METRICS.stage('archive'):
+                day = datetime.date.today().isoformat()
+                archived = self.archive.record(items, day)
+                page = self.path(config.ARCHIVE_DIR) / f'{day}.html'
+                # also re-written when the mode changed, so its .gz/.br siblings follow
+                if archived or not page.exists() or self.static_assets != page.with_name(page.name + '.gz').exists():
+                    write_day(self.archive, page.parent, day, '../' + self.output.name, self.compress)
+            METRICS.incr('archived_items', archived)
+
+        with METRICS.stage('render'):
+            manifest = {} if full else self.manifest
+            head = self.head()
+            payload = items_payload(with_image + no_image)
+            items_url = f'{config.ITEMS_FILE}?v={hashlib.sha256(payload).hexdigest()[:12]}'
+            archive_url = f'{config.ARCHIVE_DIR}/index.html' if self.archive is not None else None
+            # stream straight into the temp file; it only replaces the page if it differs
+            tmp = self.output.with_name(self.output.name + '.tmp')
+            shards = {}
+            with open(tmp, 'wb') as raw:
+                out = HashingWriter(raw)
+                cards, render_stats = render_digest(with_image, no_image, out, manifest.get('cards'),
+                                                    head=head, items_url=items_url, shards=shards,
+                                                    archive_url=archive_url)
+            digest = out.sha256.hexdigest()
+        METRICS.incr('cards', render_stats['rendered'], outcome='rendered')
+        METRICS.incr('cards', render_stats['reused'], outcome='reused')
+
+        with METRICS.stage('write'):
+            written = not (digest == manifest.get('output') and self.output.exists())
+            items_path = self.path(config.ITEMS_FILE)
+            if written or not items_path.exists():
+                # the payload goes first, so the new page never links a missing one
+                write_atomic(items_path, payload)
+                self.compress(items_path, payload)
+            self.write_shards(shards)
+            if written:
+                os.replace(tmp, self.output)
+                METRICS.incr('output_bytes', out.bytes)
+                self.compress(self.output)
+            else:
+                tmp.unlink()
+            self.manifest = {'output': digest, 'cards': cards, 'shards': sorted(shards)}
+            write_atomic(self.path(config.MANIFEST_FILE), json.dumps(self.manifest, ensure_ascii=False))
+        BREAKERS.save(self.path(config.BREAKER_FILE))
+
+        METRICS.write(self.path(config.RUN_REPORT_FILE), self.path(config.RUN_METRICS_FILE))
+        return {
+            'unchanged': unchanged,
+            'skipped': skipped,
+            'stale': stale,
+            'down': BREAKERS.open_hosts(),
+            'duplicates': dup_stats,
+            'images': image_stats,
+            'probes': probe_stats,
+            'thumbnails': thumbnails,
+            'archived': archived,
+            'cards': render_stats,
+            'written': written,
+            'stages': dict(METRICS.stages),
+        }
+
+    def write_shards(self, shards: dict):
+        """Write the "Load more" card shards and prune old ones.
+
+        Shard names carry a content hash, so existing files are left alone.
+        The previous build's shards are kept for pages loaded before this
+        one replaced them; older ones are removed.
+        """
+        directory = self.path(config.SHARD_DIR)
+        for name, data in shards.items():
+            path = directory / name
+            if not path.exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                write_atomic(path, data)
+                self.compress(path, data)
+            elif self.static_assets != path.with_name(name + '.gz').exists():
+                self.compress(path, data)   # the mode changed since it was written
+        if directory.is_dir():
+            keep = set(shards) | set(self.manifest.get('shards', ()))
+            for path in directory.glob('*.json'):
+                if path.name not in keep:
+                    path.unlink()
+                    remove_compressed(path)
+
+    def due(self) -> list:
+        """Sources whose adaptive polling interval has passed since their last fetch."""
+        return due_sources(self.sources, self.feed_state)
+
+    def compress(self, path: Path, data: bytes = None):
+        """Keep the .gz/.br siblings of an output file in step with the mode.
+
+        Without `data` the file is read back, and only in static-assets mode.
+        """
+        if self.static_assets:
+            write_compressed(path, path.read_bytes() if data is None else data)
+        else:
+            remove_compressed(path)
+
+    def head(self) -> str:
+        """The page head template, with hashed asset links in static-assets mode."""
+        if not self.static_assets:
+            return HEAD
+        if self._head is None:
+            self._head = publish(HEAD, self.path(config.ASSETS_DIR))
+        return self._head
+
+    def clear_og_cache(self):
+        self.og_cache.clear()
+
+    def close(self):
+        self.og_cache.close()
+        if self.archive is not None:
+            self.archive.close()
+
+
+_builders = {}
+
+
+def build(output: Path = None, full: bool = False, use_og_cache: bool = True, static_assets: bool = False) -> dict:
+    """Build the digest once.
+
+    The builder behind each output path is kept for the life of the
+    process, so repeated calls reuse its feed state and caches.
+    """
+    key = (Path(output or config.OUTPUT).resolve(), use_og_cache, static_assets)
+    builder = _builders.get(key)
+    if builder is None:
+        builder = _builders[key] = DigestBuilder(key[0], use_og_cache=use_og_cache, static_assets=static_assets)
+    return builder.build(full=full)
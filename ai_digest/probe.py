@@ -0,0 +1,190 @@
+"""Build-time image checks: broken, tiny and placeholder card images are dropped.
+
+Each image URL is probed once with a ranged request for its first
+config.PROBE_BYTES, enough for the format header: the result (whether it
+is an image at all, its dimensions, a hash of the bytes) is cached in
+PROBE_FILE. An item whose image is gone, smaller than PROBE_MIN_WIDTH x
+PROBE_MIN_HEIGHT, or the same picture shown on config.PROBE_DUPLICATES or
+more articles (a site logo or default banner) loses the image and renders
+as a text card, so browsers never request it.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import hashlib
+import json
+import struct
+import time
+
+from . import config, net
+from .breaker import BREAKERS, is_outage
+from .images import UNREACHABLE, per_host
+from .metrics import METRICS
+from .storage import read_json, write_atomic
+
+
+def image_size(data: bytes):
+    """(width, height) from the header of a PNG, GIF, JPEG or WebP, or None."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            w, h = struct.unpack('<HH', data[26:30])
+            return w & 0x3fff, h & 0x3fff
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+        return None
+    if data[:2] == b'\xff\xd8':
+        i = 2
+        while i + 9 <= len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:       # fill byte
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:   # markers without a length
+                i += 2
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):   # start of frame
+                h, w = struct.unpack('>HH', data[i + 5:i + 9])
+                return w, h
+            i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def _full_size(r, seen: int):
+    """The image's size in bytes as the response states it, if it does."""
+    total = r.headers.get('Content-Range', '').rpartition('/')[2]
+    if total.isdigit():
+        return int(total)
+    if r.status_code == 200 and r.headers.get('Content-Length', '').isdigit():
+        return int(r.headers['Content-Length'])
+    return seen
+
+
+def probe(url: str, deadline: float = None):
+    """Probe one image URL, giving up at `deadline` (a time.monotonic() value).
+
+    Returns {'ok': False} for an image that is gone (404, 410) or is not an image,
+    {'ok': True, 'width', 'height', 'hash'} otherwise (width and height
+    are None for formats image_size() does not read), or None when the
+    host could not be asked; that is not cached.
+    """
+    data = bytearray()
+    try:
+        headers = {'Range': f'bytes=0-{config.PROBE_BYTES - 1}'}
+        with net.get(url, deadline, headers=headers, stream=True) as r:
+            BREAKERS.record(url, r.status_code >= 500)
+            if r.status_code >= 500:
+                return None
+            if r.status_code in (404, 410):
+                return {'ok': False}
+            if r.status_code not in (200, 206):
+                return None   # e.g. rate limited or refused to the prober; the browser may still get it
+            for chunk in r.iter_content(16 * 1024):
+                data += chunk
+                if len(data) >= config.PROBE_BYTES:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    return None
+            data = bytes(data[:config.PROBE_BYTES])
+            size = image_size(data)
+            if size is None and not r.headers.get('Content-Type', '').startswith('image/'):
+                return {'ok': False}
+            # the same leading bytes and length: the same picture behind another URL
+            digest = hashlib.sha256(data + str(_full_size(r, len(data))).encode()).hexdigest()[:16]
+        return {'ok': True, 'width': size and size[0], 'height': size and size[1], 'hash': digest}
+    except Exception as exc:
+        if is_outage(exc):
+            BREAKERS.record(url, True)
+        METRICS.incr('swallowed_exceptions', site='image_probe')
+        return None
+    finally:
+        METRICS.incr('bytes_downloaded', len(data), kind='image_probe')
+
+
+class ImageProbes:
+    """Persistent image URL -> probe result, re-checked after the og:image cache TTLs.
+
+    Like the og:image cache it holds at most config.OG_CACHE_MAX_ENTRIES
+    results; expired ones are dropped when it is saved.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.index = read_json(path)
+
+    @staticmethod
+    def _fresh(entry: dict, now: float) -> bool:
+        ttl = config.OG_CACHE_HIT_TTL if entry['ok'] else config.OG_CACHE_MISS_TTL
+        return now - entry['checked'] <= ttl
+
+    def get(self, url: str):
+        entry = self.index.get(url)
+        return entry if entry is not None and self._fresh(entry, time.time()) else None
+
+    def put(self, url: str, result: dict):
+        self.index[url] = dict(result, checked=time.time())
+
+    def save(self):
+        now = time.time()
+        fresh = sorted(((url, e) for url, e in self.index.items() if self._fresh(e, now)),
+                       key=lambda pair: pair[1]['checked'], reverse=True)
+        self.index = dict(fresh[:config.OG_CACHE_MAX_ENTRIES])
+        write_atomic(self.path, json.dumps(self.index))
+
+
+def validate_images(items: list, probes: ImageProbes) -> dict:
+    """Remove the images of items whose image is dead, too small or a shared placeholder.
+
+    Returns how many images were probed or answered from `probes`, and
+    how many items lost their image for each reason. Probes run through
+    images.per_host(), under the og:image lookups' per-host cap, for at
+    most config.PROBE_BUDGET seconds. Images that could not be probed in
+    time, or whose host is down, are kept.
+    """
+    stats = {'probed': 0, 'cached': 0, 'dead': 0, 'small': 0, 'placeholder': 0}
+    results = {}
+    todo = []
+    for url in dict.fromkeys(n.image for n in items if n.image):
+        found = probes.get(url)
+        if found is None:
+            todo.append(url)
+        else:
+            results[url] = found
+            stats['cached'] += 1
+    if todo:
+        for url, found in per_host(todo, probe, config.PROBE_BUDGET).items():
+            if found is not None and found is not UNREACHABLE:
+                probes.put(url, found)
+                results[url] = found
+                stats['probed'] += 1
+        probes.save()
+
+    articles = defaultdict(set)   # content hash -> links of the articles showing it
+    for n in items:
+        found = results.get(n.image)
+        if found and found['ok']:
+            articles[found['hash']].add(n.link)
+    for n in items:
+        found = results.get(n.image)
+        if found is None:
+            continue
+        if not found['ok']:
+            reason = 'dead'
+        elif found['width'] and (found['width'] < config.PROBE_MIN_WIDTH or found['height'] < config.PROBE_MIN_HEIGHT):
+            reason = 'small'
+        elif len(articles[found['hash']]) >= config.PROBE_DUPLICATES:
+            reason = 'placeholder'
+        else:
+            continue
+        n.image = None
+        stats[reason] += 1
+    return stats
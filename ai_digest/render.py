@@ -0,0 +1,756 @@
+"""Page templates and card rendering."""
+
+import datetime
+import functools
+import hashlib
+import html as html_lib
+import json
+
+from . import config
+from .items import Item
+
+
+def attr_escape(text: str) -> str:
+    """Escape for putting into HTML attributes."""
+    # escape &,<,>," and '
+    return html_lib.escape(text or '', quote=True)
+
+
+HEAD = """<!DOCTYPE html>
+<html lang=\"en\">
+<head>
+<meta charset=\"utf-8\">
+<title>AI NEWS – __TODAY__</title>
+<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">
+
+<link rel=\"icon\" type=\"image/svg+xml\" href=\"data:image/svg+xml,%3Csvg%20xmlns='http://www.w3.org/2000/svg'%20viewBox='0%200%2064%2064'%3E%3Ctext%20x='2'%20y='52'%20font-size='52'%3E%F0%9F%A4%96%3C/text%3E%3C/svg%3E\">
+
+<style>
+:root{
+  --wine:#5b0a2b;
+  --wine2:#3b071e;
+  --gold:#f6c453;
+  --cream:#ffe9d6;
+  --text:#f7e7dd;
+  --muted:rgba(255,233,214,.80);
+  --card:rgba(255,255,255,.06);
+}
+*{box-sizing:border-box}
+html,body{height:100%}
+html{
+  background:
+    radial-gradient(1200px 600px at 75% 30%, rgba(246,196,83,.12), transparent 55%),
+    radial-gradient(900px 500px at 20% 15%, rgba(255,122,165,.12), transparent 58%),
+    linear-gradient(180deg, var(--wine), #2b0818);
+}
+body{
+  margin:0;
+  min-height:100vh;
+  font-family:Inter, Segoe UI, system-ui, -apple-system, sans-serif;
+  color:var(--text);
+  background:transparent; /* prevents horizontal cut */
+  overflow-x:hidden;
+}
+a{color:inherit;text-decoration:none}
+.container{max-width:1200px;margin:0 auto;padding:0 22px}
+
+.topbar{position:relative;z-index:5;padding:18px 0 10px}
+.nav{display:flex;align-items:center;justify-content:space-between;gap:16px}
+.brand{display:flex;align-items:center;gap:10px}
+.brand-badge{
+  width:34px;height:34px;border-radius:12px;display:grid;place-items:center;
+  background: radial-gradient(circle at 30% 30%, rgba(246,196,83,.35), rgba(255,122,165,.10));
+  border:1px solid rgba(255,255,255,.18);
+  box-shadow:0 12px 30px rgba(0,0,0,.35);
+}
+.brand-name{font-weight:1000;letter-spacing:.6px}
+.menu{display:flex;gap:22px;align-items:center;opacity:.95;font-size:12px;text-transform:uppercase;letter-spacing:.9px}
+.menu a{padding:10px 10px;border-radius:999px;border:1px solid transparent}
+.menu a:hover{border-color:rgba(255,255,255,.20);background:rgba(255,255,255,.06)}
+.right-tools{display:flex;align-items:center;gap:12px}
+#google_translate_element{min-width:120px;transform:scale(.92);transform-origin:right center}
+
+.hero{position:relative;padding:28px 0 36px}
+.hero-wrap{
+  position:relative;border-radius:26px;overflow:hidden;
+  background:
+    radial-gradient(1200px 600px at 75% 45%, rgba(255,122,165,.10), transparent 60%),
+    radial-gradient(900px 500px at 25% 20%, rgba(246,196,83,.14), transparent 58%),
+    linear-gradient(135deg, #6b0b33, var(--wine2));
+  border:1px solid rgba(255,255,255,.10);
+  box-shadow: 0 28px 80px rgba(0,0,0,.55);
+}
+.hero-wrap::before{
+  content:"";
+  position:absolute;inset:0;
+  background:
+    radial-gradient(40px 22px at 8% 18%, rgba(255,255,255,.07), transparent 70%),
+    radial-gradient(60px 30px at 18% 22%, rgba(255,255,255,.06), transparent 72%),
+    radial-gradient(52px 26px at 32% 14%, rgba(255,255,255,.05), transparent 72%),
+    radial-gradient(62px 30px at 86% 24%, rgba(255,255,255,.05), transparent 74%),
+    radial-gradient(46px 22px at 74% 18%, rgba(255,255,255,.06), transparent 74%),
+    radial-gradient(66px 32px at 90% 44%, rgba(255,255,255,.05), transparent 74%),
+    linear-gradient(90deg, rgba(255,255,255,.03), transparent 30%, rgba(255,255,255,.02));
+  opacity:.75;pointer-events:none;
+}
+.hero-inner{position:relative;display:grid;grid-template-columns: 1.05fr .95fr;gap:18px;padding:34px 34px 30px}
+.hero-left{padding:10px 6px}
+.kicker{display:inline-flex;align-items:center;gap:10px;padding:8px 12px;border-radius:999px;background:rgba(0,0,0,.18);border:1px solid rgba(255,255,255,.16);font-size:12px;letter-spacing:.8px;text-transform:uppercase;color:rgba(255,233,214,.92)}
+.kicker .dot{width:8px;height:8px;border-radius:999px;background:var(--gold);box-shadow:0 0 0 6px rgba(246,196,83,.18)}
+.hero-title{margin:18px 0 10px;font-size:54px;line-height:.95;font-weight:1000;text-transform:uppercase;letter-spacing:1px}
+.hero-sub{margin:0 0 14px;font-size:22px;color:rgba(255,233,214,.92)}
+.hero-desc{margin:0;max-width:520px;color:var(--muted);font-size:14px;line-height:1.7}
+.hero-actions{position:relative;display:flex;gap:12px;margin-top:18px;align-items:center;flex-wrap:wrap}
+.btn{display:inline-flex;align-items:center;justify-content:center;gap:10px;height:42px;padding:0 16px;border-radius:999px;border:1px solid rgba(255,255,255,.18);background:rgba(0,0,0,.18);cursor:pointer;font-weight:900}
+.btn.primary{background: linear-gradient(180deg, rgba(246,196,83,.95), rgba(246,196,83,.70));color:#2b0818;border-color:rgba(0,0,0,.12);box-shadow:0 16px 30px rgba(246,196,83,.18)}
+.btn.primary:hover{filter:brightness(1.03)}
+.btn.ghost:hover{background:rgba(255,255,255,.08)}
+
+/* Legend popover (fixed so it won't be clipped) */
+#legendPopover{
+  position:fixed;
+  width:min(360px, calc(100vw - 40px));
+  background:rgba(25,7,18,.86);
+  backdrop-filter: blur(14px);
+  border:1px solid rgba(255,255,255,.18);
+  border-radius:16px;
+  padding:14px 14px 12px;
+  box-shadow:0 18px 70px rgba(0,0,0,.55);
+  display:none;
+  z-index:12000;
+}
+#legendPopover.show{display:block;animation:popMini .22s cubic-bezier(.2,1.4,.3,1) both}
+@keyframes popMini{0%{opacity:0;transform:translateY(-6px) scale(.96)}100%{opacity:1;transform:translateY(0) scale(1)}}
+#legendPopover h4{margin:0 0 8px;font-size:14px;letter-spacing:.2px}
+#legendPopover p{margin:0;color:rgba(255,233,214,.88);line-height:1.6;font-size:13px}
+
+.logo{font-weight:1000;letter-spacing:.5px;position:relative;display:inline-block;cursor:pointer}
+.logo::after{content: attr(data-text);position:absolute;inset:0;background:linear-gradient(90deg, red,orange,yellow,green,cyan,blue,violet);background-size:300%;-webkit-background-clip:text;-webkit-text-fill-color:transparent;opacity:0;pointer-events:none}
+.logo:hover::after{opacity:1;animation:rainbow 1.8s linear infinite}
+@keyframes rainbow{0%{background-position:0%}100%{background-position:100%}}
+
+.hero-art{position:relative;display:flex;align-items:center;justify-content:center;padding:10px 0 0}
+.art-shell{width:100%;max-width:430px;aspect-ratio:1/1;border-radius:22px;background: radial-gradient(circle at 30% 30%, rgba(246,196,83,.18), rgba(0,0,0,0) 55%);border:1px solid rgba(255,255,255,.10);overflow:hidden}
+#fireworks{position:absolute;left:0;right:0;top:0;height:160px;width:100%;pointer-events:none;opacity:.92}
+
+.section{padding:26px 0 40px}
+.section h3{margin:0 0 14px;font-size:18px;letter-spacing:.2px;color:rgba(255,233,214,.95)}
+.grid-image{display:grid;grid-template-columns:repeat(auto-fill,minmax(360px,1fr));gap:20px}
+.grid-text{display:grid;grid-template-columns:repeat(auto-fill,minmax(320px,1fr));gap:18px}
+.image-card,.text-card{border-radius:18px;overflow:hidden;cursor:pointer;background:var(--card);border:1px solid rgba(255,255,255,.12);box-shadow:0 18px 50px rgba(0,0,0,.35);transition: transform .15s ease, box-shadow .15s ease}
+.image-card:hover,.text-card:hover{transform: translateY(-2px);box-shadow:0 22px 62px rgba(0,0,0,.45)}
+.image-card img{width:100%;height:210px;object-fit:cover;display:block}
+.image-card{content-visibility:auto;contain-intrinsic-size:auto 300px}
+.text-card{content-visibility:auto;contain-intrinsic-size:auto 130px}
+.load-more{display:flex;margin:22px auto 0}
+.load-more:disabled{opacity:.6;cursor:progress}
+.card-pad{padding:16px 16px 18px}
+.source{font-size:12px;opacity:.78;margin-bottom:6px}
+.card-pad h3{margin:0;font-size:18px;line-height:1.25}
+
+#quickView{position:fixed;top:50%;right:22px;transform:translateY(-50%) scale(.92);width:420px;max-height:70vh;overflow:auto;background:rgba(25, 7, 18, .72);backdrop-filter: blur(14px);border:1px solid rgba(255,255,255,.18);border-radius:18px;padding:18px 18px 16px;display:none;opacity:0;box-shadow:0 18px 70px rgba(0,0,0,.62);z-index:9999;transition: opacity .22s ease, transform .28s cubic-bezier(.2,1.4,.3,1)}
+#quickView.show{opacity:1;transform:translateY(-50%) scale(1);animation:qvPop .45s cubic-bezier(.2,1.4,.3,1) both}
+@keyframes qvPop{0%{transform:translateY(-50%) scale(.86)}60%{transform:translateY(-50%) scale(1.03)}100%{transform:translateY(-50%) scale(1)}}
+#quickView #qv-title{margin:0 0 10px;font-size:18px}
+#quickView #qv-summary{margin:0 0 14px;color:rgba(255,233,214,.88);line-height:1.65;font-size:14px}
+#quickView a{display:inline-flex;align-items:center;gap:8px;padding:10px 12px;border-radius:12px;border:1px solid rgba(255,255,255,.18);background:linear-gradient(90deg, rgba(246,196,83,.35), rgba(255,122,165,.14));font-weight:900}
+#quickView::-webkit-scrollbar{width:10px}
+#quickView::-webkit-scrollbar-thumb{background:rgba(255,255,255,.16);border-radius:20px}
+#quickView::-webkit-scrollbar-track{background:rgba(255,255,255,.05)}
+
+/* Scroll to top button */
+#toTop{
+  position:fixed;
+  right:18px;
+  bottom:18px;
+  width:44px;
+  height:44px;
+  border-radius:999px;
+  border:1px solid rgba(255,255,255,.18);
+  background:rgba(25,7,18,.65);
+  backdrop-filter: blur(12px);
+  display:none;
+  align-items:center;
+  justify-content:center;
+  cursor:pointer;
+  box-shadow:0 18px 60px rgba(0,0,0,.55);
+  z-index:13000;
+}
+#toTop.show{display:flex;animation:popMini .18s ease-out both}
+#toTop span{font-size:18px;line-height:1;transform:translateY(-1px)}
+#toTop:hover{background:rgba(255,255,255,.10)}
+
+@media (max-width: 980px){.hero-inner{grid-template-columns:1fr}.hero-title{font-size:46px}#quickView{right:12px;width:min(420px, calc(100vw - 24px))}.menu{display:none}}
+</style>
+
+<script>
+window.addEventListener('load', function () {
+  var s = document.createElement('script');
+  s.src = '//translate.google.com/translate_a/element.js?cb=googleTranslateElementInit';
+  document.body.appendChild(s);
+});
+function googleTranslateElementInit() {
+  new google.translate.TranslateElement({
+    pageLanguage: 'en',
+    includedLanguages: 'en,vi',
+    autoDisplay: false
+  }, 'google_translate_element');
+}
+
+function openQuickView(title, summary, link) {
+  document.getElementById('qv-title').innerText = title;
+  document.getElementById('qv-summary').innerText = summary;
+  document.getElementById('qv-link').href = link;
+  const qv = document.getElementById('quickView');
+  qv.style.display = 'block';
+  void qv.offsetHeight;
+  qv.classList.add('show');
+}
+// Quick View content lives in items.json, fetched the first time a card is opened
+let itemsPayload = null;
+function loadItems() {
+  if (!itemsPayload) {
+    const src = document.getElementById('quickView').getAttribute('data-items');
+    itemsPayload = fetch(src).then(r => {
+      if (!r.ok) throw new Error('items ' + r.status);
+      return r.json();
+    }).catch(err => { itemsPayload = null; throw err; });
+  }
+  return itemsPayload;
+}
+function openCard(card) {
+  const id = card.getAttribute('data-id');
+  loadItems().then(items => {
+    const item = items[id];
+    if (item) openQuickView(item[0], item[1], item[2]);
+  }).catch(() => {
+    const h = card.querySelector('h3');
+    openQuickView(h ? h.textContent : '', 'Summary unavailable right now.', '#');
+  });
+}
+// cards past the first PAGE_CARDS of a section come from JSON shards, one per click
+function loadMore(btn) {
+  btn.disabled = true;
+  fetch(btn.getAttribute('data-next')).then(r => {
+    if (!r.ok) throw new Error('cards ' + r.status);
+    return r.json();
+  }).then(shard => {
+    btn.previousElementSibling.insertAdjacentHTML('beforeend', shard.html);
+    if (shard.next) btn.setAttribute('data-next', shard.next);
+    else btn.remove();
+  }).finally(() => { btn.disabled = false; });
+}
+function closeQuickView() {
+  const qv = document.getElementById('quickView');
+  qv.classList.remove('show');
+  setTimeout(() => { qv.style.display = 'none'; }, 240);
+}
+
+function showLegend() {
+  const btn = document.getElementById('btnReadMore');
+  const pop = document.getElementById('legendPopover');
+  if (!btn || !pop) return;
+  const r = btn.getBoundingClientRect();
+  const gap = 10;
+  // default: pop under the button
+  let top = r.bottom + gap;
+  let left = r.left;
+  // keep inside viewport
+  const maxLeft = window.innerWidth - pop.offsetWidth - 10;
+  if (left > maxLeft) left = maxLeft;
+  if (left < 10) left = 10;
+  // if too low, show above
+  if (top + pop.offsetHeight > window.innerHeight - 10) {
+    top = r.top - pop.offsetHeight - gap;
+  }
+  pop.style.top = top + 'px';
+  pop.style.left = left + 'px';
+  pop.classList.add('show');
+}
+function hideLegend() {
+  const pop = document.getElementById('legendPopover');
+  if (pop) pop.classList.remove('show');
+}
+function toggleLegend(){
+  const pop = document.getElementById('legendPopover');
+  if (!pop) return;
+  if (pop.classList.contains('show')) hideLegend();
+  else showLegend();
+}
+
+// DOM ready: scroll-to-top
+document.addEventListener('DOMContentLoaded', () => {
+
+  // scroll-to-top
+  const btn = document.getElementById('toTop');
+  const onScroll = () => {
+    if (!btn) return;
+    if (window.scrollY > 420) btn.classList.add('show');
+    else btn.classList.remove('show');
+  };
+  window.addEventListener('scroll', onScroll, {passive:true});
+  onScroll();
+  if (btn) {
+    btn.addEventListener('click', () => {
+      window.scrollTo({top:0, behavior:'smooth'});
+    });
+  }
+});
+
+// one delegated listener: card click -> quick view, load more, close popups when click outside
+document.addEventListener('click', e => {
+  const card = e.target.closest('.image-card,.text-card');
+  if (card) openCard(card);
+  else if (!e.target.closest('#quickView')) closeQuickView();
+  const more = e.target.closest('.load-more');
+  if (more && !more.disabled) loadMore(more);
+  if (!e.target.closest('#legendPopover,#btnReadMore')) {
+    hideLegend();
+  }
+});
+
+document.addEventListener('keydown', e => {
+  if (e.key === 'Escape') { closeQuickView(); hideLegend(); }
+});
+
+// update legend position on resize/scroll
+window.addEventListener('resize', () => {
+  const pop = document.getElementById('legendPopover');
+  if (pop && pop.classList.contains('show')) showLegend();
+});
+window.addEventListener('scroll', () => {
+  const pop = document.getElementById('legendPopover');
+  if (pop && pop.classList.contains('show')) showLegend();
+}, {passive:true});
+
+// Fireworks (safe: NO `${}` template literals)
+// Particles live in a fixed pool of typed arrays and dead ones are
+// swap-removed; colors are precomputed per alpha step. Drawing is capped
+// at FW_FPS and stops while the hero is off-screen, the tab is hidden or
+// the reader prefers reduced motion.
+(function() {
+  const FW_MAX = 600, FW_FPS = 30, FW_TICK = 1000 / 60, FW_ALPHAS = 16;
+  const colors = ['#f6c453','#ffe9d6','#ff7aa5','#f97316','#22c55e','#60a5fa'];
+  const styles = colors.map(hex => {
+    const rgb = [1, 3, 5].map(i => parseInt(hex.substring(i, i + 2), 16)).join(',');
+    const row = [];
+    for (let k = 0; k <= FW_ALPHAS; k++) row.push('rgba(' + rgb + ',' + (k / FW_ALPHAS) + ')');
+    return row;
+  });
+  const px = new Float32Array(FW_MAX), py = new Float32Array(FW_MAX);
+  const vx = new Float32Array(FW_MAX), vy = new Float32Array(FW_MAX);
+  const life = new Float32Array(FW_MAX), rad = new Float32Array(FW_MAX);
+  const col = new Uint8Array(FW_MAX);
+  let count = 0;
+
+  function burst(x, y) {
+    const n = 42 + Math.floor(Math.random() * 22);
+    for (let k = 0; k < n && count < FW_MAX; k++, count++) {
+      const a = Math.random() * Math.PI * 2;
+      const sp = 1.0 + Math.random() * 3.6;
+      px[count] = x; py[count] = y;
+      vx[count] = Math.cos(a) * sp;
+      vy[count] = Math.sin(a) * sp;
+      life[count] = 58 + Math.random() * 26;
+      rad[count] = 1 + Math.random() * 2;
+      col[count] = (Math.random() * colors.length) | 0;
+    }
+  }
+
+  function remove(i) {
+    const j = --count;
+    px[i] = px[j]; py[i] = py[j]; vx[i] = vx[j]; vy[i] = vy[j];
+    life[i] = life[j]; rad[i] = rad[j]; col[i] = col[j];
+  }
+
+  function start() {
+    const canvas = document.getElementById('fireworks');
+    if (!canvas) return;
+    const ctx = canvas.getContext('2d');
+    const reduced = window.matchMedia ? matchMedia('(prefers-reduced-motion: reduce)') : {matches: false};
+    let W = 0, H = 0, onScreen = true, running = false, last = 0, ticks = 0;
+
+    function resize() {
+      const rect = canvas.getBoundingClientRect();
+      W = rect.width; H = rect.height;
+      canvas.width = Math.floor(W * devicePixelRatio);
+      canvas.height = Math.floor(H * devicePixelRatio);
+      ctx.setTransform(devicePixelRatio, 0, 0, devicePixelRatio, 0, 0);
+    }
+
+    // one simulation tick, tuned for 60 per second whatever the frame rate
+    function tick() {
+      ticks++;
+      if (ticks % 26 === 0) burst(60 + Math.random() * (W - 120), 24 + Math.random() * 55);
+      for (let i = count - 1; i >= 0; i--) {
+        life[i] -= 1;
+        vy[i] += 0.03;
+        vx[i] *= 0.988;
+        vy[i] *= 0.988;
+        px[i] += vx[i];
+        py[i] += vy[i];
+        if (life[i] <= 0 || py[i] > H + 30) remove(i);
+      }
+    }
+
+    function draw() {
+      ctx.fillStyle = 'rgba(0,0,0,0.18)';
+      ctx.fillRect(0, 0, W, H);
+      for (let i = 0; i < count; i++) {
+        const alpha = Math.min(FW_ALPHAS, Math.round(life[i] / 84 * FW_ALPHAS));
+        ctx.fillStyle = styles[col[i]][alpha];
+        ctx.beginPath();
+        ctx.arc(px[i], py[i], rad[i], 0, Math.PI * 2);
+        ctx.fill();
+      }
+    }
+
+    function step(now) {
+      if (!onScreen || document.hidden || reduced.matches) { running = false; return; }
+      requestAnimationFrame(step);
+      const elapsed = now - last;
+      if (elapsed < 1000 / FW_FPS - 1) return;
+      // a slow frame catches up at most a few ticks rather than jumping ahead
+      const n = Math.min(4, Math.round(elapsed / FW_TICK));
+      last = now;
+      for (let k = 0; k < n; k++) tick();
+      draw();
+    }
+
+    function resume() {
+      if (running || !onScreen || document.hidden || reduced.matches) return;
+      running = true;
+      last = performance.now();
+      requestAnimationFrame(step);
+    }
+
+    window.addEventListener('resize', resize);
+    resize();
+    document.addEventListener('visibilitychange', resume);
+    if (reduced.addEventListener) reduced.addEventListener('change', resume);
+    if ('IntersectionObserver' in window) {
+      new IntersectionObserver(entries => {
+        onScreen = entries[entries.length - 1].isIntersecting;
+        resume();
+      }).observe(canvas);
+    }
+    setTimeout(() => { burst(W * 0.5, 28); }, 280);
+    resume();
+  }
+
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', start);
+  else start();
+})();
+</script>
+</head>
+<body>
+
+<div class=\"topbar\">\
+  <div class=\"container nav\">\
+    <div class=\"brand\">\
+      <div class=\"brand-badge\">🤖</div>\
+      <div class=\"brand-name\"><span class=\"logo\" data-text=\"AI NEWS\">AI NEWS</span></div>\
+    </div>\
+    <div class=\"menu\">\
+      <a href=\"#featured\">Featured</a>\
+      <a href=\"#more\">More</a>\
+      <a href=\"#how\">How it works</a>\
+      <a href=\"#contact\">Contact</a>__ARCHIVE__\
+    </div>\
+    <div class=\"right-tools\">\
+      <div id=\"google_translate_element\"></div>\
+    </div>\
+  </div>\
+</div>
+
+<section class=\"hero\">\
+  <div class=\"container\">\
+    <div class=\"hero-wrap\">\
+      <canvas id=\"fireworks\"></canvas>\
+      <div class=\"hero-inner\">\
+        <div class=\"hero-left\">\
+          <div class=\"kicker\"><span class=\"dot\"></span> Lunar New Year Digest</div>\
+          <div class=\"hero-title\">CHINESE<br>NEW YEAR</div>\
+          <div class=\"hero-sub\">Celebration</div>\
+          <p class=\"hero-desc\">Click any card to preview in Quick View, then open full article. Cards stay minimal — full summary appears in the pop-up.</p>\
+          <div class=\"hero-actions\">\
+            <button id=\"btnReadMore\" class=\"btn primary\" type=\"button\" onclick=\"toggleLegend()\">Read More →</button>\
+            <a class=\"btn ghost\" href=\"#more\">More News</a>\
+          </div>\
+        </div>\
+        <div class=\"hero-art\" aria-hidden=\"true\">\
+          <div class=\"art-shell\">\
+            <svg viewBox=\"0 0 520 520\" width=\"100%\" height=\"100%\" xmlns=\"http://www.w3.org/2000/svg\">\
+              <defs>\
+                <radialGradient id=\"g1\" cx=\"30%\" cy=\"30%\" r=\"70%\">\
+                  <stop offset=\"0%\" stop-color=\"#f6c453\" stop-opacity=\"0.55\"/>\
+                  <stop offset=\"60%\" stop-color=\"#ff7aa5\" stop-opacity=\"0.12\"/>\
+                  <stop offset=\"100%\" stop-color=\"#000000\" stop-opacity=\"0\"/>\
+                </radialGradient>\
+                <linearGradient id=\"g2\" x1=\"0\" y1=\"0\" x2=\"1\" y2=\"1\">\
+                  <stop offset=\"0%\" stop-color=\"#ffb84d\"/>\
+                  <stop offset=\"100%\" stop-color=\"#f6c453\"/>\
+                </linearGradient>\
+              </defs>\
+              <circle cx=\"270\" cy=\"260\" r=\"220\" fill=\"url(#g1)\"/>\
+              <path d=\"M90 350c0-42 34-76 76-76 14 0 27 4 38 10 14-30 44-50 79-50 40 0 74 26 86 62 8-3 16-4 25-4 39 0 71 32 71 71 0 39-32 71-71 71H170c-44 0-80-36-80-80z\" fill=\"rgba(255,255,255,0.08)\" stroke=\"rgba(255,255,255,0.12)\"/>\
+              <path d=\"M260 365c-12-58 8-118 56-156 16-13 17-29 2-38-30-18-68 12-83 50-14-24-38-44-64-41-22 3-33 25-17 42 29 30 55 74 62 143z\" fill=\"#2b0818\" opacity=\"0.78\"/>\
+              <g>\
+                <path d=\"M165 170c22-30 64-40 96-22 34-26 85-16 105 22 22 42-10 93-62 96-20 1-32-6-45-17-23 22-60 28-90 10-44-26-55-68-4-89z\" fill=\"url(#g2)\" opacity=\"0.95\"/>\
+                <path d=\"M315 210c12-16 34-21 52-12 18-14 44-9 54 12 12 22-5 49-31 50-11 1-17-3-24-9-12 11-30 14-46 6-22-13-27-36-5-47z\" fill=\"rgba(246,196,83,.88)\"/>\
+              </g>\
+              <g fill=\"#ffe9d6\" opacity=\"0.95\">\
+                <circle cx=\"184\" cy=\"222\" r=\"10\"/><circle cx=\"200\" cy=\"210\" r=\"7\"/><circle cx=\"215\" cy=\"224\" r=\"6\"/>\
+                <circle cx=\"345\" cy=\"238\" r=\"10\"/><circle cx=\"360\" cy=\"226\" r=\"7\"/><circle cx=\"372\" cy=\"242\" r=\"6\"/>\
+              </g>\
+            </svg>\
+          </div>\
+        </div>\
+      </div>\
+    </div>\
+  </div>\
+</section>
+
+<!-- Legend popover element (fixed layer, not clipped) -->
+<div id=\"legendPopover\">\
+  <h4>Legend of Chinese Lunar New Year</h4>\
+  <p>According to legend, a beast named Nian came each year to harm villages. People discovered Nian feared loud sounds, bright lights, and the color red. So they hung red decorations, lit firecrackers, and used lanterns to drive it away—forming the traditions we celebrate today.</p>\
+</div>
+
+<section class=\"section\" id=\"featured\">\
+  <div class=\"container\">\
+    <h3>Featured</h3>\
+    <div class=\"grid-image\">\
+"""
+
+TAIL = """
+    </div>
+__MORE__  </div>
+</section>
+
+<section class=\"section\" id=\"more\">\
+  <div class=\"container\">\
+    <h3>More news</h3>\
+    <div class=\"grid-text\">\
+
+    </div>
+  </div>
+</section>
+
+<section class=\"section\" id=\"how\">\
+  <div class=\"container\">\
+    <h3>How it works</h3>\
+    <div style=\"opacity:.82; line-height:1.7; max-width:880px;\">Click any card → preview in Quick View → open full article. Use Translate at the top right.__ARCHIVE__</div>\
+  </div>\
+</section>
+
+<section class=\"section\" id=\"contact\">\
+  <div class=\"container\">\
+    <h3>Contact</h3>\
+    <div style=\"opacity:.82; line-height:1.7;\">Want thêm lồng đèn rủ xuống, dây pháo, hoa mai/hoa đào? Nói mình chỉnh tiếp.</div>\
+    <div style=\"margin-top:14px; font-weight:1000; letter-spacing:.8px; color:rgba(255,233,214,.95);\">FROM MR. THOR WITH LOVE</div>\
+  </div>\
+</section>
+
+<div id=\"quickView\" data-items=\"__ITEMS__\">\
+  <h3 id=\"qv-title\"></h3>\
+  <p id=\"qv-summary\"></p>\
+  <a id=\"qv-link\" target=\"_blank\">Open full article →</a>\
+</div>\
+
+<div id=\"toTop\" title=\"Back to top\"><span>↑</span></div>
+
+</body>
+</html>
+"""
+
+MIDDLE = """
+    </div>
+__MORE__  </div>
+</section>
+
+<section class=\"section\" id=\"more\">\
+  <div class=\"container\">\
+    <h3>More news</h3>\
+    <div class=\"grid-text\">\
+"""
+
+
+ARCHIVE_INDEX = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>AI NEWS – archive</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<style>
+body{margin:0;padding:32px 22px;min-height:100vh;font-family:Inter, Segoe UI, system-ui, -apple-system, sans-serif;color:#f7e7dd;background:linear-gradient(180deg, #5b0a2b, #2b0818)}
+.container{max-width:720px;margin:0 auto}
+a{color:inherit}
+li{margin:8px 0}
+</style>
+</head>
+<body>
+<div class="container">
+<h1>AI NEWS archive</h1>
+<ul>
+__DAYS__</ul>
+<p><a href="__HOME__">← today's digest</a></p>
+</div>
+</body>
+</html>
+"""
+
+
+def item_id(n: Item) -> str:
+    """Stable id tying a card to its entry in the items payload."""
+    return hashlib.sha1(f'{n.link}\n{n.title}'.encode('utf-8')).hexdigest()[:10]
+
+
+def items_payload(items: list) -> bytes:
+    """Compact JSON {id: [title, summary, link]} that Quick View fetches on demand."""
+    payload = {item_id(n): [n.title, n.summary, n.link] for n in items}
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def render_image_card(n: Item) -> str:
+    # Featured cards carry only an id; Quick View looks the rest up in the items payload
+    title = attr_escape(n.title)
+
+    img_tag = ''
+    if n.thumb:
+        t = n.thumb
+        img_tag = (f'<img src="{attr_escape(t["src"])}" srcset="{attr_escape(t["srcset"])}" '
+                   f'sizes="{config.THUMB_SIZES}" width="{t["width"]}" height="{t["height"]}" '
+                   'loading="lazy" decoding="async" alt="" onerror="this.style.display=\'none\'">')
+    elif n.image:
+        img_url = attr_escape(n.image)
+        width, height = min(config.THUMB_WIDTHS), config.THUMB_HEIGHT
+        img_tag = (f'<img src="{img_url}" width="{width}" height="{height}" '
+                   'loading="lazy" decoding="async" alt="" onerror="this.style.display=\'none\'">')
+
+    return (
+        f'  <div class="image-card" data-id="{item_id(n)}">\n'
+        + img_tag + '\n'
+        + '    <div class="card-pad">\n'
+        + f'      <div class="source">{attr_escape(n.source)}</div>\n'
+        + f'      <h3>{title}</h3>\n'
+        + '    </div>\n'
+        + '  </div>\n'
+    )
+
+
+def render_text_card(n: Item) -> str:
+    title = attr_escape(n.title)
+
+    return (
+        f'  <div class="text-card" data-id="{item_id(n)}">\n'
+        + '    <div class="card-pad">\n'
+        + f'      <div class="source">{attr_escape(n.source)}</div>\n'
+        + f'      <h3>{title}</h3>\n'
+        + '    </div>\n'
+        + '  </div>\n'
+    )
+
+
+def card_key(render, n: Item) -> str:
+    raw = json.dumps([config.CARD_VERSION, render.__name__, n.fields()], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=4)
+def page_head(today: str, template: str = HEAD, archive_url: str = None) -> str:
+    link = f'<a href="{attr_escape(archive_url)}">Archive</a>' if archive_url else ''
+    return template.replace('__TODAY__', today).replace('__ARCHIVE__', link)
+
+
+def page_tail(items_url: str, more: str, archive_url: str = None) -> str:
+    note = f' Earlier days are in the <a href="{attr_escape(archive_url)}">archive</a>.' if archive_url else ''
+    return TAIL.replace('__MORE__', more).replace('__ITEMS__', attr_escape(items_url)).replace('__ARCHIVE__', note)
+
+
+def write_cards(out, items: list, render, previous: dict, current: dict, stats: dict, limit: int = None) -> list:
+    """Write cards to `out`, reusing fragments from the previous build's manifest.
+
+    Only the first `limit` cards are written; the fragments of the rest are returned.
+    """
+    rest = []
+    for i, n in enumerate(items):
+        key = card_key(render, n)
+        fragment = previous.get(key)
+        if fragment is None:
+            fragment = render(n)
+            stats['rendered'] += 1
+        else:
+            stats['reused'] += 1
+        current[key] = fragment
+        if limit is None or i < limit:
+            out.write(fragment)
+        else:
+            rest.append(fragment)
+    return rest
+
+
+def card_shards(section: str, fragments: list, shards: dict) -> str:
+    """Split card fragments into JSON shards of config.PAGE_CARDS, each naming the next.
+
+    Shards are added to `shards` as {file name: bytes}; names carry a
+    content hash, so they can be cached for good. Returns the page-relative
+    URL of the first shard.
+    """
+    url = None
+    for start in reversed(range(0, len(fragments), config.PAGE_CARDS)):
+        data = json.dumps({'html': ''.join(fragments[start:start + config.PAGE_CARDS]), 'next': url},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        name = f'{section}-{start // config.PAGE_CARDS + 1}.{hashlib.sha256(data).hexdigest()[:12]}.json'
+        shards[name] = data
+        url = f'{config.SHARD_DIR}/{name}'
+    return url
+
+
+def load_more(url: str) -> str:
+    if not url:
+        return ''
+    return f'    <button class="btn ghost load-more" type="button" data-next="{attr_escape(url)}">Load more</button>\n'
+
+
+def render_digest(with_image: list, no_image: list, out, previous_cards: dict = None, today: str = None,
+                  head: str = HEAD, items_url: str = None, shards: dict = None, archive_url: str = None) -> tuple:
+    """Write the page to the text stream `out`; returns (card fragments by key, stats).
+
+    The page is written piece by piece, so it is never held in memory as
+    a whole. `today` defaults to the current date, so a resident process
+    that builds across midnight still stamps the right day. `head` is the
+    template for everything before the first card, e.g. one from
+    assets.publish(). `items_url` is where the page fetches the
+    items_payload() for Quick View, and `archive_url`, if given, the
+    archive index that the menu and the "How it works" section link to.
+
+    When a `shards` dict is given, each section shows its first
+    config.PAGE_CARDS cards and the rest are added to it as card_shards(),
+    which the page loads on "Load more"; otherwise every card is inline.
+    """
+    today = today or datetime.date.today().strftime(config.DATE_FORMAT)
+    previous_cards = previous_cards or {}
+    cards = {}
+    stats = {'rendered': 0, 'reused': 0}
+
+    limit = None if shards is None else config.PAGE_CARDS
+
+    out.write(page_head(today, head, archive_url))
+    rest = write_cards(out, with_image, render_image_card, previous_cards, cards, stats, limit)
+    more = card_shards('featured', rest, shards) if rest else None
+    out.write(MIDDLE.replace('__MORE__', load_more(more)))
+    rest = write_cards(out, no_image, render_text_card, previous_cards, cards, stats, limit)
+    more = card_shards('more', rest, shards) if rest else None
+    out.write(page_tail(items_url or config.ITEMS_FILE, load_more(more), archive_url))
+    return cards, stats
+
+
+def render_archive_index(days: list, home: str = None) -> str:
+    """The archive's index page: one link per day page, newest first."""
+    links = ''.join(
+        f'<li><a href="{day}.html">{datetime.date.fromisoformat(day).strftime(config.DATE_FORMAT)}</a></li>\n'
+        for day in days
+    )
+    home = home or '../' + config.OUTPUT.name
+    return ARCHIVE_INDEX.replace('__DAYS__', links).replace('__HOME__', attr_escape(home))
@@ -0,0 +1,60 @@
+"""Adaptive polling: how often each source is worth fetching.
+
+A source's cadence is learned from two signals kept in the feed state:
+the publish times of its entries and the times a fetch actually brought
+new entries. Busy feeds are polled more often and quiet ones less, always
+within config.POLL_MIN and config.POLL_MAX. A source with a fixed
+`interval` (registry or SOURCE_INTERVALS) keeps it.
+"""
+
+import time
+
+from . import config
+from .sources import Source
+
+MAX_CHANGES = 20   # change times remembered per feed
+
+
+def publish_gap(stored: dict):
+    """Typical seconds between new entries, or None without enough history."""
+    gaps = []
+    published = sorted({e['published'] for e in stored.get('entries', []) if e.get('published')})
+    if len(published) >= 2:
+        gaps.append((published[-1] - published[0]) / (len(published) - 1))
+    changes = stored.get('changes', [])
+    if len(changes) >= 2:
+        gaps.append((changes[-1] - changes[0]) / (len(changes) - 1))
+    return min(gaps) if gaps else None
+
+
+def poll_interval(source: Source, stored: dict = None) -> float:
+    """Seconds to wait between fetches of `source`, given its stored state."""
+    if source.fixed_interval is not None:
+        return source.fixed_interval
+    gap = publish_gap(stored or {})
+    if gap is None:
+        return config.DAEMON_INTERVAL
+    return min(config.POLL_MAX, max(config.POLL_MIN, gap * config.POLL_FACTOR))
+
+
+def due_sources(sources: dict, state: dict, now: float = None) -> list:
+    """Names of the sources whose interval has passed since they were last fetched."""
+    now = time.time() if now is None else now
+    due = []
+    for name, source in sources.items():
+        stored = state.get(source.url, {})
+        if now - stored.get('checked', 0.0) >= poll_interval(source, stored):
+            due.append(name)
+    return due
+
+
+def record_poll(stored: dict, previous: dict, now: float = None) -> dict:
+    """Stamp a freshly stored feed with its poll time and, if new entries arrived, a change time."""
+    now = time.time() if now is None else now
+    changes = list(previous.get('changes', []))
+    links = [e['link'] for e in stored.get('entries', [])]
+    if 'entries' in previous and links != [e['link'] for e in previous['entries']]:
+        changes = (changes + [now])[-MAX_CHANGES:]
+    stored['checked'] = now
+    stored['changes'] = changes
+    return stored
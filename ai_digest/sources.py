@@ -0,0 +1,158 @@
+"""Source registry: the feeds to follow and per-source settings.
+
+The registry is a TOML (or, with PyYAML installed, YAML) file:
+
+    [defaults]
+    limit = 8
+    images = "og"
+
+    [[source]]
+    name = "OpenAI"
+    url = "https://openai.com/blog/rss.xml"
+    limit = 5           # entries taken from this feed
+    timeout = 10        # seconds the feed may take end to end
+    interval = 3600     # fixed refresh interval instead of the adaptive one
+    images = "feed"     # "og": feed image, else og:image lookup; "feed": feed image only; "none"
+    enabled = false
+
+Settings left out fall back to [defaults], then to ai_digest.config.
+Without a registry file the built-in config.SOURCES are used. OPML
+subscription lists can be imported into a registry.
+"""
+
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+from . import config
+
+try:
+    import tomllib
+except ImportError:   # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:   # optional: only needed for YAML registries
+    yaml = None
+
+IMAGE_POLICIES = ('og', 'feed', 'none')
+
+
+class Source:
+    """One feed and how to treat it."""
+
+    __slots__ = ('name', 'url', 'limit', 'timeout', 'interval', 'images', 'enabled')
+
+    def __init__(self, name: str, url: str, limit: int = None, timeout: float = None,
+                 interval: float = None, images: str = 'og', enabled: bool = True):
+        if images not in IMAGE_POLICIES:
+            raise ValueError(f'source {name!r}: images must be one of {", ".join(IMAGE_POLICIES)}')
+        self.name = name
+        self.url = url
+        self.limit = limit
+        self.timeout = timeout
+        self.interval = interval
+        self.images = images
+        self.enabled = enabled
+
+    @property
+    def max_entries(self) -> int:
+        return config.MAX_PER_SOURCE if self.limit is None else self.limit
+
+    @property
+    def deadline(self) -> float:
+        return config.FEED_DEADLINE if self.timeout is None else self.timeout
+
+    @property
+    def fixed_interval(self):
+        """The configured refresh interval, or None to let the scheduler adapt it."""
+        if self.interval is not None:
+            return self.interval
+        return config.SOURCE_INTERVALS.get(self.name)
+
+    def __repr__(self):
+        return f'Source({self.name!r}, {self.url!r})'
+
+
+def as_sources(sources) -> dict:
+    """Normalize {name: url or Source} (or a list of Sources) to enabled {name: Source}."""
+    if isinstance(sources, dict):
+        sources = [s if isinstance(s, Source) else Source(name, s) for name, s in sources.items()]
+    return {s.name: s for s in sources if s.enabled}
+
+
+def load_registry(path: Path) -> list:
+    """Read the sources in a .toml, .yaml or .yml registry, disabled ones included."""
+    text = path.read_text(encoding='utf-8')
+    if path.suffix in ('.yaml', '.yml'):
+        if yaml is None:
+            raise RuntimeError(f'{path}: reading YAML registries needs PyYAML (pip install pyyaml)')
+        data = yaml.safe_load(text) or {}
+    else:
+        if tomllib is None:
+            raise RuntimeError(f'{path}: reading TOML on Python < 3.11 needs tomli (pip install tomli)')
+        data = tomllib.loads(text)
+
+    defaults = data.get('defaults', {})
+    sources = []
+    for entry in data.get('source', data.get('sources', [])):
+        fields = dict(defaults, **entry)
+        unknown = set(fields) - set(Source.__slots__)
+        if unknown:
+            raise ValueError(f'{path}: unknown setting(s) {", ".join(sorted(unknown))} '
+                             f'for source {fields.get("name")!r}')
+        sources.append(Source(**fields))
+    return sources
+
+
+def import_opml(path: Path) -> list:
+    """Sources for every feed outline in an OPML file, nested folders included."""
+    sources = []
+    for outline in ET.parse(path).iter('outline'):
+        url = outline.get('xmlUrl')
+        if url:
+            sources.append(Source(outline.get('title') or outline.get('text') or url, url))
+    return sources
+
+
+def _toml_value(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def dump_registry(sources: list) -> str:
+    """TOML for `sources`, writing only settings that differ from the defaults."""
+    blocks = []
+    for s in sources:
+        lines = ['[[source]]']
+        for name in Source.__slots__:
+            value = getattr(s, name)
+            default = value is None or (name, value) in (('images', 'og'), ('enabled', True))
+            if name in ('name', 'url') or not default:
+                lines.append(f'{name} = {_toml_value(value)}')
+        blocks.append('\n'.join(lines) + '\n')
+    return '\n'.join(blocks)
+
+
+def merge(existing: list, new: list) -> list:
+    """`existing` plus the sources of `new` whose URL it does not have yet."""
+    known = {s.url for s in existing}
+    names = {s.name for s in existing}
+    merged = list(existing)
+    for s in new:
+        if s.url in known:
+            continue
+        base, n = s.name, 1
+        while s.name in names:
+            n += 1
+            s.name = f'{base} ({n})'
+        known.add(s.url)
+        names.add(s.name)
+        merged.append(s)
+    return merged
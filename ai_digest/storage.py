@@ -0,0 +1,70 @@
+"""Small file helpers shared by the state, cache and output writers."""
+
+from pathlib import Path
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:   # optional: without it only .gz siblings are written
+    brotli = None
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def write_atomic(path: Path, data):
+    """Write text or bytes to a temp file and rename it over `path`.
+
+    Readers see either the old file or the new one, never a partial write.
+    """
+    tmp = path.with_name(path.name + '.tmp')
+    if isinstance(data, bytes):
+        tmp.write_bytes(data)
+    else:
+        tmp.write_text(data, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def write_compressed(path: Path, data: bytes):
+    """Write `.gz` (and `.br`, when brotli is installed) siblings of `path`.
+
+    They are what a static host serves to clients that accept them, so
+    they are rewritten together with the file; a `.br` left over from an
+    install that had brotli is removed rather than left stale.
+    """
+    write_atomic(path.with_name(path.name + '.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    br = path.with_name(path.name + '.br')
+    if brotli is not None:
+        write_atomic(br, brotli.compress(data, quality=11))
+    else:
+        br.unlink(missing_ok=True)
+
+
+def remove_compressed(path: Path):
+    for suffix in COMPRESSED_SUFFIXES:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+class HashingWriter:
+    """Text stream over a binary file that tracks the sha256 and size of what it wrote."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode('utf-8')
+        self.sha256.update(data)
+        self.bytes += len(data)
+        self.raw.write(data)
+        return len(text)
+
+
+def read_json(path: Path, default=None):
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {} if default is None else default
@@ -0,0 +1,207 @@
+"""Card thumbnails: each card image downloaded once and resized for the grid.
+
+Downloads are stored by content hash, so the same picture behind two URLs
+is resized once, and a build only fetches images it has not seen. Needs
+Pillow; without it the stage is skipped and cards hotlink the original.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import hashlib
+import io
+import json
+import threading
+import time
+
+from . import config, net
+from .breaker import BREAKERS, is_outage
+from .images import UNREACHABLE, per_host
+from .metrics import METRICS
+from .storage import read_json, write_atomic
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:   # optional: without Pillow cards keep the original image URL
+    Image = None
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def thumb_format() -> str:
+    if config.THUMB_FORMAT == 'webp' and not features.check('webp'):
+        return 'jpeg'
+    return config.THUMB_FORMAT
+
+
+def download(url: str, deadline: float = None):
+    """Return the image bytes, or None if it fails, exceeds THUMB_MAX_BYTES or is not in by `deadline`."""
+    seen = 0
+    try:
+        with net.get(url, deadline, stream=True) as r:
+            BREAKERS.record(url, r.status_code >= 500)
+            if r.status_code != 200:
+                return None
+            chunks = []
+            for chunk in r.iter_content(64 * 1024):
+                seen += len(chunk)
+                if seen > config.THUMB_MAX_BYTES:
+                    return None
+                if deadline is not None and time.monotonic() > deadline:
+                    return None
+                chunks.append(chunk)
+            return b''.join(chunks)
+    except Exception as exc:
+        if is_outage(exc):
+            BREAKERS.record(url, True)
+        METRICS.incr('swallowed_exceptions', site='thumbnail')
+        return None
+    finally:
+        METRICS.incr('bytes_downloaded', seen, kind='thumbnail')
+
+
+def resize(data: bytes, directory: Path, digest: str) -> list:
+    """Write cover-cropped thumbnails for each of THUMB_WIDTHS; returns their file names.
+
+    Widths wider than the source are skipped, except the smallest, so an
+    image is never blown up more than once.
+    """
+    fmt = thumb_format()
+    suffix = '.jpg' if fmt == 'jpeg' else '.' + fmt
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        names = []
+        for i, width in enumerate(sorted(config.THUMB_WIDTHS)):
+            if i and width > img.width:
+                break
+            height = round(width * config.THUMB_HEIGHT / min(config.THUMB_WIDTHS))
+            out = io.BytesIO()
+            ImageOps.fit(img, (width, height), Image.LANCZOS).save(out, fmt, quality=config.THUMB_QUALITY)
+            name = f'{digest[:16]}-{width}{suffix}'
+            write_atomic(directory / name, out.getvalue())
+            names.append(name)
+    return names
+
+
+class ThumbnailStore:
+    """Image URL -> thumbnail files under `directory`, remembered in `index_path`.
+
+    Entries and files that neither this build nor the previous one asked
+    for are removed when the store is saved, like the card shards.
+    """
+
+    def __init__(self, directory: Path, index_path: Path):
+        self.directory = directory
+        self.index_path = index_path
+        # url -> {'hash', 'files'} or {'failed': timestamp}, plus 'recent' if the last build used it
+        self.index = read_json(index_path)
+        self.by_hash = {e['hash']: e['files'] for e in self.index.values() if 'hash' in e}
+        self.previous = {url for url, e in self.index.items() if e.get('recent')}
+        self.used = set()
+        self._lock = threading.Lock()
+        self._resizing = defaultdict(threading.Lock)   # content hash -> lock, so one copy is resized once
+
+    def _on_disk(self, files) -> bool:
+        return bool(files) and all((self.directory / name).exists() for name in files)
+
+    def cached(self, url: str):
+        """The stored record for `url` if its files are on disk or it failed recently, else None."""
+        with self._lock:
+            self.used.add(url)
+            entry = self.index.get(url)
+        if entry and 'failed' in entry:
+            if time.time() - entry['failed'] < config.OG_CACHE_MISS_TTL:
+                return entry
+        elif entry and self._on_disk(entry['files']):
+            METRICS.incr('thumbnails', outcome='cached')
+            return entry
+        return None
+
+    def thumbnail(self, url: str, deadline: float = None):
+        """Return the thumbnail record for `url`, making it if needed; None on failure."""
+        entry = self.cached(url)
+        if entry is not None:
+            return entry if 'files' in entry else None
+
+        data = download(url, deadline)
+        if data is None and deadline is not None and time.monotonic() > deadline:
+            return None   # out of time, not broken: tried again next build
+        try:
+            if data is None:
+                raise ValueError('download failed')
+            digest = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                resizing = self._resizing[digest]
+            with resizing:
+                with self._lock:
+                    files = self.by_hash.get(digest)
+                if not self._on_disk(files):
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    files = resize(data, self.directory, digest)
+                    with self._lock:
+                        self.by_hash[digest] = files
+            entry = {'hash': digest, 'files': files}
+            METRICS.incr('thumbnails', outcome='made')
+        except Exception:
+            METRICS.incr('thumbnails', outcome='failed')
+            entry = {'failed': time.time()}
+        with self._lock:
+            self.index[url] = entry
+        return entry if 'files' in entry else None
+
+    def save(self):
+        """Write the index and drop what neither this build nor the previous one used."""
+        with self._lock:
+            keep = self.used | self.previous
+            self.index = {url: dict(e, recent=url in self.used) for url, e in self.index.items() if url in keep}
+            self.by_hash = {e['hash']: e['files'] for e in self.index.values() if 'hash' in e}
+            files = {name for names in self.by_hash.values() for name in names}
+            self.previous, self.used = self.used, set()
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                if path.is_file() and path.name not in files:
+                    path.unlink()
+        write_atomic(self.index_path, json.dumps(self.index))
+
+
+def srcset(files: list) -> dict:
+    """The <img> attributes for a thumbnail record's files, smallest first."""
+    base = config.THUMB_DIR
+    widths = [int(name.rsplit('-', 1)[1].split('.')[0]) for name in files]
+    return {
+        'src': f'{base}/{files[0]}',
+        'srcset': ', '.join(f'{base}/{name} {w}w' for name, w in zip(files, widths)),
+        'width': widths[0],
+        'height': round(widths[0] * config.THUMB_HEIGHT / min(config.THUMB_WIDTHS)),
+    }
+
+
+def make_thumbnails(items: list, store: ThumbnailStore) -> int:
+    """Point items with an image at local thumbnails; returns how many got one.
+
+    Images already on disk are used directly. The rest are downloaded
+    through images.per_host() within config.THUMB_BUDGET; those not in
+    by then, or on a host that is down, stay hotlinked.
+    """
+    if not available():
+        return 0
+    records = {}
+    todo = []
+    for url in dict.fromkeys(n.image for n in items if n.image):
+        entry = store.cached(url)
+        if entry is None:
+            todo.append(url)
+        elif 'files' in entry:
+            records[url] = entry
+    for url, record in per_host(todo, store.thumbnail, config.THUMB_BUDGET).items():
+        if record is not UNREACHABLE:
+            records[url] = record
+    store.save()
+    done = 0
+    for n in items:
+        record = records.get(n.image)
+        if record:
+            n.thumb = srcset(record['files'])
+            done += 1
+    return done
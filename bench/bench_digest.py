@@ -0,0 +1,192 @@
+"""Benchmark the digest pipeline against local fixtures, without network.
+
+    python bench/bench_digest.py --latency 0.2 --slow towards-data-science=2
+
+Each source in SOURCES is pointed at its recorded feed on a FixtureServer,
+then the fetch -> parse -> dedupe -> enrich -> probe -> render stages run one after
+another. For every stage the median wall time over --repeat rounds, the
+peak traced Python memory and the HTTP requests served are reported.
+The parse stage re-parses the recorded feed bytes on their own, so it
+measures parser CPU cost without the network in the way.
+Settings in ai_digest.config can be overridden with --set NAME=VALUE to
+compare concurrency or budget settings.
+
+    python bench/bench_digest.py --sources 300 --slow towards-data-science=2
+
+--sources N registers N sources by cycling through the recorded feeds, to
+check that fetch time follows the slowest feeds rather than the count.
+All fixture feeds share one host, so FEED_PER_HOST is raised to
+FEED_WORKERS unless it is --set explicitly.
+"""
+
+from pathlib import Path
+import argparse
+import ast
+import io
+import json
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fixture_server import FixtureServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ai_digest import config, dedupe, feeds, images, probe, render  # noqa: E402
+
+STAGES = ('fetch', 'parse', 'dedupe', 'enrich', 'probe', 'render')
+
+
+def slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def bench_sources(server, count: int = None) -> dict:
+    sources = {name: server.feed_url(slug(name)) for name in config.SOURCES}
+    if not count:
+        return sources
+    names = list(sources)
+    return {f'{names[i % len(names)]} #{i}': f'{sources[names[i % len(names)]]}?copy={i}' for i in range(count)}
+
+
+def run_round(server, count: int = None) -> dict:
+    sources = bench_sources(server, count)
+    results = {}
+    state = {}
+
+    def stage(name, fn):
+        before = server.snapshot()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            start_mem = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] - start_mem if tracing else 0
+        after = server.snapshot()
+        results[name] = {
+            'seconds': elapsed,
+            'peak_bytes': peak,
+            'requests': sum(after['requests'].values()) - sum(before['requests'].values()),
+            'bytes_served': after['bytes'] - before['bytes'],
+        }
+        return value
+
+    fetched = stage('fetch', lambda: feeds.fetch_feeds(sources, state))
+
+    bodies = []
+    for url in sources.values():
+        found = server.render(url[len(server.base_url):])
+        if found:
+            bodies.append((found[0], {'content-location': url, 'content-type': found[1]}))
+    stage('parse', lambda: [feeds.parse_feed(body, headers) for body, headers in bodies])
+
+    items = stage('dedupe', lambda: dedupe.dedupe_items(feeds.feed_items(fetched))[0])
+    image_stats = stage('enrich', lambda: images.enrich_images(items))
+    with tempfile.TemporaryDirectory() as tmp:
+        probes = probe.ImageProbes(Path(tmp) / config.PROBE_FILE)
+        probe_stats = stage('probe', lambda: probe.validate_images(items, probes))
+    with_image = [n for n in items if n.image]
+    no_image = [n for n in items if not n.image]
+    html_out = io.StringIO()
+    shards = {}
+    stage('render', lambda: render.render_digest(with_image, no_image, html_out, shards=shards))
+
+    results['_totals'] = {
+        'sources': len(sources),
+        'items': len(items),
+        'with_image': len(with_image),
+        'html_bytes': len(html_out.getvalue().encode('utf-8')),
+        'items_bytes': len(render.items_payload(with_image + no_image)),
+        'shards': len(shards),
+        'shard_bytes': sum(len(data) for data in shards.values()),
+        'images': image_stats,
+        'probes': probe_stats,
+    }
+    return results
+
+
+def summarize(rounds: list) -> dict:
+    summary = {}
+    for name in STAGES:
+        summary[name] = {
+            'seconds': statistics.median(r[name]['seconds'] for r in rounds),
+            'peak_bytes': max(r[name]['peak_bytes'] for r in rounds),
+            'requests': rounds[-1][name]['requests'],
+            'bytes_served': rounds[-1][name]['bytes_served'],
+        }
+    summary['total_seconds'] = sum(summary[name]['seconds'] for name in STAGES)
+    summary['totals'] = rounds[-1]['_totals']
+    return summary
+
+
+def print_report(summary: dict, args):
+    print(f'{summary["totals"]["sources"]} sources, latency {args.latency:.3f}s, slow {args.slow or "-"}, '
+          f'{args.repeat} round(s)')
+    print(f'{"stage":<8} {"wall s":>9} {"peak KiB":>10} {"requests":>9} {"KiB served":>11}')
+    for name in STAGES:
+        s = summary[name]
+        print(f'{name:<8} {s["seconds"]:>9.3f} {s["peak_bytes"] / 1024:>10.1f} '
+              f'{s["requests"]:>9} {s["bytes_served"] / 1024:>11.1f}')
+    print(f'{"total":<8} {summary["total_seconds"]:>9.3f}')
+    t = summary['totals']
+    print(f'{t["items"]} items, {t["with_image"]} with image, {t["html_bytes"] / 1024:.1f} KiB html '
+          f'+ {t["items_bytes"] / 1024:.1f} KiB items payload + {t["shard_bytes"] / 1024:.1f} KiB in '
+          f'{t["shards"]} card shards, og:image {t["images"]}, probes {t["probes"]}')
+
+
+def parse_overrides(pairs: list) -> dict:
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition('=')
+        overrides[name] = ast.literal_eval(value)
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='seconds added to every response (default 0.05)')
+    parser.add_argument('--slow', action='append', default=[], metavar='PATH=SECONDS',
+                        help='extra delay for paths containing PATH, e.g. towards-data-science=2')
+    parser.add_argument('--repeat', type=int, default=3, help='rounds to run (default 3)')
+    parser.add_argument('--sources', type=int, metavar='N',
+                        help='register N sources cycling through the fixture feeds (default: one per feed)')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a setting in ai_digest.config, e.g. IMAGE_PER_HOST=8')
+    parser.add_argument('--no-trace', action='store_true',
+                        help='skip tracemalloc; timings get more accurate, peak memory reads 0')
+    parser.add_argument('--json', type=Path, help='also write the summary as JSON to this file')
+    args = parser.parse_args(argv)
+
+    overrides = parse_overrides(args.set)
+    if args.sources and 'FEED_PER_HOST' not in overrides:
+        overrides['FEED_PER_HOST'] = overrides.get('FEED_WORKERS', config.FEED_WORKERS)
+    for name, value in overrides.items():
+        if not hasattr(config, name):
+            parser.error(f'unknown setting {name}')
+        setattr(config, name, value)
+    slow = {k: float(v) for k, _, v in (s.rpartition('=') for s in args.slow)}
+
+    if not args.no_trace:
+        tracemalloc.start()
+    rounds = []
+    with FixtureServer(latency=args.latency, slow=slow) as server:
+        for _ in range(args.repeat):
+            rounds.append(run_round(server, args.sources))
+    if not args.no_trace:
+        tracemalloc.stop()
+
+    summary = summarize(rounds)
+    print_report(summary, args)
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Compare the bounded fastfeed parser with feedparser on the recorded feeds.
+
+    python bench/bench_parse.py --limit 8 --repeat 20
+
+For every feed under bench/fixtures/feeds both parsers produce the first
+--limit entry records; the median time per parse, the speed-up and
+whether the two agree on every field the digest uses are reported.
+Summaries are compared as the plain text the page shows.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import feedparser
+
+ROOT = Path(__file__).resolve().parent.parent
+FEEDS = Path(__file__).resolve().parent / 'fixtures' / 'feeds'
+sys.path.insert(0, str(ROOT))
+
+from ai_digest import fastfeed, feeds  # noqa: E402
+
+BASE = 'http://127.0.0.1'
+
+
+def with_feedparser(body: bytes, limit: int) -> list:
+    headers = {'content-location': BASE + '/feed.xml', 'content-type': 'application/rss+xml; charset=utf-8'}
+    return [feeds.entry_record(e) for e in feedparser.parse(body, response_headers=headers).entries[:limit]]
+
+
+def with_fastfeed(body: bytes, limit: int) -> list:
+    return fastfeed.parse_entries(body, limit, BASE + '/feed.xml')
+
+
+def comparable(records: list) -> list:
+    return [dict(r, summary=feeds.summary_text(r['summary'])) for r in records]
+
+
+def median_seconds(fn, body: bytes, limit: int, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(body, limit)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=8, help='entries to keep per feed (default 8)')
+    parser.add_argument('--repeat', type=int, default=20, help='parses per feed and parser (default 20)')
+    parser.add_argument('--json', type=Path, help='also write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f'{"feed":<24} {"KiB":>7} {"feedparser ms":>14} {"fastfeed ms":>12} {"speed-up":>9}  same')
+    for path in sorted(FEEDS.glob('*.xml')):
+        body = path.read_text(encoding='utf-8').replace('{{base}}', BASE).encode('utf-8')
+        slow = median_seconds(with_feedparser, body, args.limit, args.repeat)
+        fast = median_seconds(with_fastfeed, body, args.limit, args.repeat)
+        same = comparable(with_feedparser(body, args.limit)) == comparable(with_fastfeed(body, args.limit))
+        results[path.stem] = {'bytes': len(body), 'feedparser': slow, 'fastfeed': fast, 'same': same}
+        print(f'{path.stem:<24} {len(body) / 1024:>7.1f} {slow * 1000:>14.2f} {fast * 1000:>12.2f} '
+              f'{slow / fast:>8.1f}x  {"yes" if same else "NO"}')
+
+    total_slow = sum(r['feedparser'] for r in results.values())
+    total_fast = sum(r['fastfeed'] for r in results.values())
+    print(f'{"total":<24} {"":>7} {total_slow * 1000:>14.2f} {total_fast * 1000:>12.2f} '
+          f'{total_slow / total_fast:>8.1f}x')
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    return 0 if all(r['same'] for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
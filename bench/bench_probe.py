@@ -0,0 +1,54 @@
+"""Check probe.image_size() against the recorded image headers.
+
+    python bench/bench_probe.py
+
+Every file under bench/fixtures/images is named after its dimensions
+(<width>x<height>-<what>.<ext>, or unknown-<what>.<ext> for formats
+image_size() does not read). Each is cut to config.PROBE_BYTES, as a
+ranged probe would receive it, and the size read from the header is
+compared with the name.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import re
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES = Path(__file__).resolve().parent / 'fixtures' / 'images'
+sys.path.insert(0, str(ROOT))
+
+from ai_digest import config, probe  # noqa: E402
+
+
+def expected(path: Path):
+    m = re.match(r'(\d+)x(\d+)', path.name)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def shown(size) -> str:
+    return 'x'.join(map(str, size)) if size else '-'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', type=Path, help='also write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f'{"image":<32} {"bytes":>7} {"expected":>10} {"read":>10}  same')
+    for path in sorted(IMAGES.iterdir()):
+        data = path.read_bytes()[:config.PROBE_BYTES]
+        want, got = expected(path), probe.image_size(data)
+        got = tuple(got) if got else None
+        results[path.name] = {'bytes': len(data), 'expected': want, 'read': got, 'same': want == got}
+        print(f'{path.name:<32} {len(data):>7} {shown(want):>10} {shown(got):>10}  {"yes" if want == got else "NO"}')
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    return 0 if all(r['same'] for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
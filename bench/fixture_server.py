@@ -0,0 +1,153 @@
+"""Local HTTP stand-in for the feed and article hosts used by the digest.
+
+Serves the recorded files under bench/fixtures on 127.0.0.1:
+
+    /feed/<slug>.xml          fixtures/feeds/<slug>.xml
+    /article/<kind>/<slug>    fixtures/articles/<kind>.html (og, twitter, none)
+    /img/<file>               fixtures/images/<file> (header samples per format)
+    /img/<name>               otherwise a 1200x630 PNG in a color derived from <name>
+
+`{{base}}` in a fixture is replaced by the server's base URL and `{{slug}}`
+by the article slug. Every response can be delayed to mimic slow upstreams,
+and requests and bytes are counted so a benchmark can report them per stage.
+"""
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import functools
+import hashlib
+import mimetypes
+import struct
+import sys
+import threading
+import time
+import zlib
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+@functools.lru_cache(maxsize=256)
+def png(name: str, width: int = 1200, height: int = 630) -> bytes:
+    """A solid-color PNG, distinct for every name like a real article image."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    row = b'\x00' + hashlib.sha1(name.encode('utf-8')).digest()[:3] * width
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height))
+            + chunk(b'IEND', b''))
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients hang up mid-response on purpose (head-only reads, deadlines)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """Threaded fixture server; use as a context manager."""
+
+    def __init__(self, root: Path = FIXTURES, latency: float = 0.0, slow: dict = None):
+        self.root = root
+        self.latency = latency
+        self.slow = dict(slow or {})   # substring of the path -> extra seconds
+        self.requests = Counter()      # 'feed' / 'article' / 'other' -> count
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = _QuietServer(('127.0.0.1', 0), self._handler())
+        self.base_url = 'http://127.0.0.1:%d' % self._httpd.server_port
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def feed_url(self, slug: str) -> str:
+        return f'{self.base_url}/feed/{slug}.xml'
+
+    def feed_slugs(self) -> list:
+        return sorted(p.stem for p in (self.root / 'feeds').glob('*.xml'))
+
+    def render(self, path: str):
+        """Return (body, content type) for a request path, or None for 404."""
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'feed':
+            file, ctype, slug = self.root / 'feeds' / parts[1], 'application/rss+xml; charset=utf-8', ''
+        elif len(parts) == 3 and parts[0] == 'article':
+            file, ctype, slug = self.root / 'articles' / f'{parts[1]}.html', 'text/html; charset=utf-8', parts[2]
+        elif len(parts) == 2 and parts[0] == 'img':
+            sample = self.root / 'images' / parts[1]
+            if sample.is_file():
+                return sample.read_bytes(), mimetypes.guess_type(sample.name)[0] or 'application/octet-stream'
+            return png(parts[1]), 'image/png'
+        else:
+            return None
+        if not file.is_file():
+            return None
+        text = file.read_text(encoding='utf-8')
+        return text.replace('{{base}}', self.base_url).replace('{{slug}}', slug).encode('utf-8'), ctype
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'requests': dict(self.requests), 'bytes': self.bytes_sent}
+
+    def _count(self, kind: str, sent: int):
+        with self._lock:
+            self.requests[kind] += 1
+            self.bytes_sent += sent
+
+    def _delay(self, path: str) -> float:
+        return self.latency + sum(s for key, s in self.slow.items() if key in path)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                kind = self.path.split('/')[1] if self.path.count('/') > 1 else 'other'
+                time.sleep(server._delay(self.path))
+                found = server.render(self.path)
+                if found is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    server._count('other', 0)
+                    return
+                body, ctype = found
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    server._count(kind, 0)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                sent = 0
+                try:
+                    for i in range(0, len(body), 16 * 1024):
+                        self.wfile.write(body[i:i + 16 * 1024])
+                        sent += len(body[i:i + 16 * 1024])
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # client stopped reading early, e.g. after </head>
+                server._count(kind, sent)
+
+        return Handler